@@ -0,0 +1,94 @@
+"""Compare one-prompt-at-a-time generation with batched Inference.infer_batch
+and with YES/NO label scoring (Inference.score).
+
+Runs on CPU with any small causal LM, e.g.:
+    PYTHONPATH=. python benchmarks/bench_batch_inference.py \
+        --model sshleifer/tiny-gpt2 --rows 64 --max-new-tokens 16
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+
+import torch
+from src.components.inference.infer import Inference
+from src.components.prompts.judge import PROMPT_WITH_CONTEXT
+from transformers import AutoModelForCausalLM
+from transformers import AutoTokenizer
+
+
+def make_rows(rows: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    words = 'salary leave policy insurance contract bonus tax holiday'.split()
+
+    def sentence(low: int, high: int) -> str:
+        return ' '.join(rng.choices(words, k=rng.randint(low, high)))
+
+    return [
+        {
+            'instruction': sentence(5, 20),
+            'input': sentence(20, 150),
+            'output': sentence(10, 60),
+            'label': '',
+        }
+        for _ in range(rows)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', default='sshleifer/tiny-gpt2')
+    parser.add_argument('--rows', type=int, default=64)
+    parser.add_argument('--max-new-tokens', type=int, default=16)
+    parser.add_argument('--max-batch-tokens', type=int, default=16384)
+    parser.add_argument('--device', default='cpu')
+    args = parser.parse_args()
+
+    torch.manual_seed(0)
+    tokenizer = AutoTokenizer.from_pretrained(args.model)
+    model = AutoModelForCausalLM.from_pretrained(args.model).to(args.device)
+    model.eval()
+    inference = Inference(device=args.device)
+    inference.get_model(model, tokenizer)
+    rows = make_rows(args.rows)
+    generate_kwargs = {'do_sample': False, 'min_new_tokens': args.max_new_tokens}
+
+    with torch.inference_mode():
+        start = time.perf_counter()
+        for row in rows:
+            inputs = inference.get_inputs(PROMPT_WITH_CONTEXT, row)
+            model.generate(
+                **inputs,
+                max_new_tokens=args.max_new_tokens,
+                pad_token_id=tokenizer.eos_token_id,
+                **generate_kwargs,
+            )
+        sequential = time.perf_counter() - start
+
+        start = time.perf_counter()
+        inference.infer_batch(
+            PROMPT_WITH_CONTEXT,
+            rows,
+            max_new_tokens=args.max_new_tokens,
+            max_batch_tokens=args.max_batch_tokens,
+            **generate_kwargs,
+        )
+        batched = time.perf_counter() - start
+
+        start = time.perf_counter()
+        inference.score(
+            PROMPT_WITH_CONTEXT, rows, max_batch_tokens=args.max_batch_tokens,
+        )
+        scored = time.perf_counter() - start
+
+    print(f'rows:       {args.rows}')
+    print(f'sequential: {sequential:.2f}s ({args.rows / sequential:.1f} rows/s)')
+    print(f'batched:    {batched:.2f}s ({args.rows / batched:.1f} rows/s)')
+    print(f'speedup:    {sequential / batched:.1f}x')
+    print(f'scoring:    {scored:.2f}s ({args.rows / scored:.1f} rows/s)')
+    print(f'speedup:    {sequential / scored:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+"""Measure the cost of importing the chunking package.
+
+Each run imports the package in a fresh interpreter and reports the
+wall time, whether llama_index was pulled in and whether OPENAI_API_KEY
+was touched.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_chunking_import.py --runs 10
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = '''
+import json, os, sys, time
+before = os.environ.get('OPENAI_API_KEY')
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+print(json.dumps({{
+    'seconds': seconds,
+    'llama_index_loaded': any(
+        name.startswith('llama_index') for name in sys.modules
+    ),
+    'api_key_changed': os.environ.get('OPENAI_API_KEY') != before,
+}}))
+'''
+
+
+def run_once(module: str) -> dict:
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module)],
+        check=True,
+        capture_output=True,
+        text=True,
+        env={**os.environ, 'PYTHONPATH': os.environ.get('PYTHONPATH', '.')},
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--module', default='src.components.chunking')
+    args = parser.parse_args()
+
+    results = [run_once(args.module) for _ in range(args.runs)]
+    times_ms = [1000 * result['seconds'] for result in results]
+    print(f'import {args.module}: {args.runs} runs')
+    print(f'  median   {statistics.median(times_ms):8.2f} ms')
+    print(f'  max      {max(times_ms):8.2f} ms')
+    print(
+        '  llama_index loaded: '
+        f'{any(result["llama_index_loaded"] for result in results)}',
+    )
+    print(
+        '  OPENAI_API_KEY changed: '
+        f'{any(result["api_key_changed"] for result in results)}',
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""Compare semantic chunking throughput of the embedding backends.
+
+The local backend runs offline; the OpenAI backend is skipped unless
+OPENAI_API_KEY is set.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_embedding_backends.py --docs 200
+    PYTHONPATH=. python benchmarks/bench_embedding_backends.py \
+        --backends local --local-model sentence-transformers/all-MiniLM-L6-v2
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from typing import List
+
+from src.components.chunking.embeddings import get_backend
+from src.components.chunking.llamaindex import LlamaIndexChunker
+
+TOPICS = [
+    'the payment gateway', 'employee onboarding', 'quarterly revenue',
+    'the mobile app', 'data retention', 'customer refunds',
+    'server maintenance', 'holiday schedules',
+]
+
+
+def make_docs(num_docs: int, sentences: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    docs = []
+    for _ in range(num_docs):
+        topic = rng.choice(TOPICS)
+        words = []
+        for i in range(sentences):
+            if rng.random() < 0.1:
+                topic = rng.choice(TOPICS)
+            words.append(
+                f'Note {i} explains how {topic} affects '
+                f'{rng.choice(TOPICS)} this week.',
+            )
+        docs.append(' '.join(words))
+    return docs
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--docs', type=int, default=200)
+    parser.add_argument('--sentences', type=int, default=40)
+    parser.add_argument('--backends', default='local,openai')
+    parser.add_argument(
+        '--local-model', default='sentence-transformers/all-MiniLM-L6-v2',
+    )
+    parser.add_argument('--device', default='cpu')
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args()
+
+    docs = make_docs(args.docs, args.sentences)
+    for name in args.backends.split(','):
+        if name == 'openai' and not os.environ.get('OPENAI_API_KEY'):
+            print('openai: skipped, OPENAI_API_KEY is not set')
+            continue
+        if name == 'local':
+            backend = get_backend(
+                'local',
+                model_name=args.local_model,
+                device=args.device,
+                batch_size=args.batch_size,
+            )
+        else:
+            backend = get_backend(name)
+        chunker = LlamaIndexChunker(embedding_backend=backend)
+        chunker.chunk_text(docs[0])
+
+        start = time.perf_counter()
+        chunks = sum(len(chunker.chunk_text(doc)) for doc in docs)
+        seconds = time.perf_counter() - start
+        print(
+            f'{name:8s} {backend.model_id}: {args.docs / seconds:8.1f} docs/s, '
+            f'{args.docs * args.sentences / seconds:9.1f} sentences/s, '
+            f'{chunks} chunks',
+        )
+
+
+if __name__ == '__main__':
+    main()
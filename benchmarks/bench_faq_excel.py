@@ -0,0 +1,140 @@
+"""Compare streaming FAQ workbook ingestion with the notebook's approach.
+
+The notebook (BD-01-FAQ-Dataset.ipynb) reads every sheet with
+pd.read_excel(sheet_name=None) and turns each into a list of dicts. Each
+approach runs in its own process so peak RSS is measured separately.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_faq_excel.py --sheets 8 --rows 20000
+    PYTHONPATH=. python benchmarks/bench_faq_excel.py --workbook faq.xlsx
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+HEADER = [
+    'No.', 'Categories', 'Question', 'Answer (VN)', 'Anwers (EN)',
+    'Main PIC',
+]
+CATEGORIES = [
+    'Salary Calculation', 'Social Insurance', 'Annual Leave',
+    'Personal Income Tax', 'Health Care', 'Onboarding',
+]
+WORDS = (
+    'employee salary insurance leave tax contract payroll benefit '
+    'manager approval request policy month bank'
+).split()
+
+
+def make_workbook(path: str, sheets: int, rows: int, seed: int = 0) -> None:
+    """Sheets laid out like the HR FAQ: a blank row, then the header"""
+    from openpyxl import Workbook
+
+    rng = random.Random(seed)
+
+    def text(words: int) -> str:
+        return ' '.join(rng.choices(WORDS, k=words)).capitalize()
+
+    workbook = Workbook(write_only=True)
+    for index in range(sheets):
+        sheet = workbook.create_sheet(f'FAQ {index}')
+        sheet.append([])
+        sheet.append(HEADER)
+        for row in range(rows):
+            # Merged category cells only keep their value in the first row.
+            category = rng.choice(CATEGORIES) if row % 10 == 0 else None
+            sheet.append(
+                [
+                    row + 1,
+                    category,
+                    f'{text(12)}?\n{text(12)}?',
+                    text(40),
+                    text(40),
+                    rng.choice(['HR', 'C&B', 'Payroll']),
+                ],
+            )
+    workbook.save(path)
+
+
+def run_pandas(workbook: str, output: str) -> int:
+    import pandas as pd
+
+    sheets_dict = pd.read_excel(workbook, sheet_name=None, engine='openpyxl')
+    combined_data = []
+    for _, df in sheets_dict.items():
+        combined_data.extend(df.to_dict(orient='records'))
+    pd.DataFrame(combined_data).astype(str).to_parquet(output)
+    return len(combined_data)
+
+
+def run_streaming(workbook: str, output: str) -> int:
+    from src.components.data_pre.faq_excel import excel_to_parquet
+
+    return excel_to_parquet(workbook, output)
+
+
+def child(approach: str, workbook: str, output: str) -> None:
+    start = time.perf_counter()
+    rows = {'pandas': run_pandas, 'streaming': run_streaming}[approach](
+        workbook, output,
+    )
+    print(
+        json.dumps(
+            {
+                'rows': rows,
+                'seconds': time.perf_counter() - start,
+                'peak_rss_mb': resource.getrusage(
+                    resource.RUSAGE_SELF,
+                ).ru_maxrss / 1024,
+            },
+        ),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sheets', type=int, default=8)
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--workbook', default=None)
+    parser.add_argument('--child', nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(*args.child)
+        return
+
+    workdir = tempfile.mkdtemp(prefix='bench_faq_')
+    workbook = args.workbook
+    if workbook is None:
+        workbook = os.path.join(workdir, 'faq.xlsx')
+        make_workbook(workbook, args.sheets, args.rows)
+    print(
+        f'{workbook}: {os.path.getsize(workbook) / 1024 ** 2:.1f}MB',
+    )
+    for approach in ('pandas', 'streaming'):
+        output = subprocess.run(
+            [
+                sys.executable, __file__, '--child', approach, workbook,
+                os.path.join(workdir, f'{approach}.parquet'),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(
+            f'  {approach:9s} {result["rows"]:9d} rows '
+            f'{result["seconds"]:8.2f} s '
+            f'{result["peak_rss_mb"]:8.1f} MB peak RSS',
+        )
+
+
+if __name__ == '__main__':
+    main()
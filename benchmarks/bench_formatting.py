@@ -0,0 +1,75 @@
+"""Compare the vectorized judge prompt formatter with the per-row loop.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_formatting.py --rows 1000000
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import string
+import time
+from types import SimpleNamespace
+
+import pyarrow as pa
+from src.components.data_pre.sft_judge import SFTJudge
+
+
+def make_table(rows: int, seed: int = 0) -> pa.Table:
+    rng = random.Random(seed)
+
+    def text(length: int) -> str:
+        return ''.join(rng.choices(string.ascii_letters + ' ', k=length))
+
+    pool = [text(rng.randint(20, 400)) for _ in range(1000)]
+    return pa.table(
+        {
+            'instruction': [pool[rng.randrange(1000)] for _ in range(rows)],
+            'input': [pool[rng.randrange(1000)] for _ in range(rows)],
+            'output': [pool[rng.randrange(1000)] for _ in range(rows)],
+            'label': [rng.choice(['YES', 'NO']) for _ in range(rows)],
+        },
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=200_000)
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--mode', default='with_context')
+    args = parser.parse_args()
+
+    table = make_table(args.rows)
+    tokenizer = SimpleNamespace(eos_token='<|endoftext|>')
+    judge = SFTJudge()
+    formatter = judge.prompt_formatter(mode=args.mode, tokenizer=tokenizer)
+    batches = [
+        table.slice(offset, args.batch_size)
+        for offset in range(0, table.num_rows, args.batch_size)
+    ]
+    dict_batches = [batch.to_pydict() for batch in batches]
+
+    start = time.perf_counter()
+    loop_texts = []
+    for batch in dict_batches:
+        loop_texts.extend(
+            judge.formatting_prompts_func(
+                batch, mode=args.mode, tokenizer=tokenizer,
+            )['text'],
+        )
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vector_texts = [formatter(batch) for batch in batches]
+    vector_seconds = time.perf_counter() - start
+
+    identical = loop_texts == pa.concat_tables(vector_texts)['text'].to_pylist()
+    print(f'rows:          {args.rows}')
+    print(f'loop:          {loop_seconds:.3f}s ({args.rows / loop_seconds:,.0f} rows/s)')
+    print(f'vectorized:    {vector_seconds:.3f}s ({args.rows / vector_seconds:,.0f} rows/s)')
+    print(f'speedup:       {loop_seconds / vector_seconds:.1f}x')
+    print(f'byte-identical: {identical}')
+
+
+if __name__ == '__main__':
+    main()
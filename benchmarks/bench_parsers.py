@@ -0,0 +1,207 @@
+"""Throughput of the local parsers, per file type.
+
+Synthetic PDF, DOCX, XLSX, XLS (when xlwt is installed), CSV, TXT and
+HTML files are generated under --workdir and parsed with iter_parse.
+Real files can be benchmarked too: every file in --files-dir with a
+known extension is added to its type.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_parsers.py --pages 200
+    PYTHONPATH=. python benchmarks/bench_parsers.py --files-dir data/raw
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict
+from typing import List
+
+from src.base import ParseInput
+from src.components.parsing.engine import file_type_of
+from src.components.parsing.registry import get_parser
+from src.models import FileType
+
+WORDS = (
+    'employee leave salary policy insurance laptop request manager '
+    'approval payroll training office holiday contract benefit'
+).split()
+
+
+def sentence(rng: random.Random) -> str:
+    return ' '.join(rng.choices(WORDS, k=rng.randint(6, 16))).capitalize()
+
+
+def write_pdf(path: str, pages: int, rng: random.Random) -> None:
+    """Minimal text PDF with one Helvetica content stream per page"""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    kids = []
+    for _ in range(pages):
+        lines = [sentence(rng) for _ in range(40)]
+        stream = 'BT /F1 10 Tf 40 800 Td 12 TL ' + ' '.join(
+            f'({line}) Tj T*' for line in lines
+        ) + ' ET'
+        objects.append(
+            f'<< /Length {len(stream)} >>\nstream\n{stream}\nendstream'
+            .encode('latin-1'),
+        )
+        objects.append(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            f'/Resources << /Font << /F1 3 0 R >> >> '
+            f'/Contents {len(objects)} 0 R >>'.encode('latin-1'),
+        )
+        kids.append(f'{len(objects)} 0 R')
+    objects[1] = (
+        f'<< /Type /Pages /Kids [{" ".join(kids)}] /Count {pages} >>'
+        .encode('latin-1')
+    )
+    with open(path, 'wb') as f:
+        f.write(b'%PDF-1.4\n')
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(f'{number} 0 obj\n'.encode() + body + b'\nendobj\n')
+        xref = f.tell()
+        f.write(f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode())
+        for offset in offsets:
+            f.write(f'{offset:010d} 00000 n \n'.encode())
+        f.write(
+            f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n'
+            f'startxref\n{xref}\n%%EOF\n'.encode(),
+        )
+
+
+def write_docx(path: str, pages: int, rng: random.Random) -> None:
+    from docx import Document
+
+    document = Document()
+    for _ in range(pages):
+        for _ in range(20):
+            document.add_paragraph(sentence(rng))
+        document.add_page_break()
+    document.save(path)
+
+
+def write_xlsx(path: str, pages: int, rng: random.Random) -> None:
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    for index in range(max(1, pages // 50)):
+        sheet = workbook.create_sheet(f'Sheet{index}')
+        sheet.append(['No.', 'Question', 'Answer'])
+        for row in range(2000):
+            sheet.append([row, sentence(rng) + '?', sentence(rng)])
+    workbook.save(path)
+
+
+def write_xls(path: str, pages: int, rng: random.Random) -> None:
+    import xlwt
+
+    workbook = xlwt.Workbook()
+    for index in range(max(1, pages // 50)):
+        sheet = workbook.add_sheet(f'Sheet{index}')
+        for row in range(2000):
+            for column, value in enumerate(
+                [row, sentence(rng) + '?', sentence(rng)],
+            ):
+                sheet.write(row, column, value)
+    workbook.save(path)
+
+
+def write_csv(path: str, pages: int, rng: random.Random) -> None:
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['query', 'chunk', 'response'])
+        for _ in range(pages * 40):
+            writer.writerow([sentence(rng), sentence(rng), sentence(rng)])
+
+
+def write_txt(path: str, pages: int, rng: random.Random) -> None:
+    with open(path, 'w') as f:
+        for _ in range(pages):
+            f.write('\n'.join(sentence(rng) + '.' for _ in range(40)))
+            f.write('\n\f')
+
+
+def write_html(path: str, pages: int, rng: random.Random) -> None:
+    with open(path, 'w') as f:
+        f.write('<html><head><style>p {color: red}</style></head><body>')
+        for _ in range(pages):
+            f.write('<section><h2>' + sentence(rng) + '</h2>')
+            for _ in range(40):
+                f.write(f'<p>{sentence(rng)} &amp; more.</p>')
+            f.write('<script>var x = 1;</script></section>')
+        f.write('</body></html>')
+
+
+WRITERS = {
+    FileType.PDF: write_pdf,
+    FileType.DOCX: write_docx,
+    FileType.XLSX: write_xlsx,
+    FileType.XLS: write_xls,
+    FileType.CSV: write_csv,
+    FileType.TXT: write_txt,
+    FileType.HTML: write_html,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--workdir', default=None)
+    parser.add_argument('--files-dir', default=None)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='bench_parsers_')
+    os.makedirs(workdir, exist_ok=True)
+    files: Dict[FileType, List[str]] = defaultdict(list)
+    rng = random.Random(0)
+    for file_type, write in WRITERS.items():
+        path = os.path.join(workdir, f'sample.{file_type.value}')
+        try:
+            write(path, args.pages, rng)
+        except ImportError as error:
+            print(f'{file_type.value}: no sample, {error}')
+            continue
+        files[file_type].append(path)
+    if args.files_dir:
+        for name in sorted(os.listdir(args.files_dir)):
+            path = os.path.join(args.files_dir, name)
+            try:
+                files[file_type_of(path)].append(path)
+            except ValueError:
+                continue
+
+    print(f'{"type":5s} {"files":>5s} {"MB":>8s} {"pages":>7s} '
+          f'{"MB/s":>8s} {"pages/s":>9s}')
+    for file_type, paths in files.items():
+        local_parser = get_parser(file_type)
+        size = sum(os.path.getsize(path) for path in paths) / 1024 ** 2
+        best = float('inf')
+        pages = 0
+        for _ in range(args.repeat):
+            pages = 0
+            start = time.perf_counter()
+            for path in paths:
+                for _ in local_parser.iter_parse(
+                    ParseInput(file_path=path, file_type=file_type),
+                ):
+                    pages += 1
+            best = min(best, time.perf_counter() - start)
+        print(
+            f'{file_type.value:5s} {len(paths):5d} {size:8.2f} {pages:7d} '
+            f'{size / best:8.2f} {pages / best:9.1f}',
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Compare native semantic splitting with SemanticSplitterNodeParser.
+
+Both paths use the same embedding backend: by default a cheap hashing
+bag-of-words embedder, so the timings show the splitting overhead rather
+than model speed. Chunk boundaries of the two paths are compared page by
+page.
+
+Usage:
+    PYTHONPATH=. python benchmarks/bench_semantic_split.py --pages 10000
+    PYTHONPATH=. python benchmarks/bench_semantic_split.py --pages 1000 \
+        --local-model sentence-transformers/all-MiniLM-L6-v2
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+import zlib
+from typing import List
+
+import numpy as np
+from llama_index.core import Document
+from llama_index.core.node_parser import SemanticSplitterNodeParser
+from src.components.chunking.embeddings import EmbeddingBackend
+from src.components.chunking.embeddings import get_backend
+from src.components.chunking.llamaindex import BackendEmbedding
+from src.components.chunking.semantic import NativeSemanticSplitter
+
+TOPICS = {
+    'leave': ['annual', 'leave', 'days', 'request', 'manager', 'approval'],
+    'payroll': ['salary', 'payroll', 'bank', 'transfer', 'tax', 'month'],
+    'insurance': ['health', 'insurance', 'claim', 'hospital', 'card'],
+    'laptop': ['laptop', 'device', 'IT', 'ticket', 'repair', 'password'],
+    'training': ['course', 'training', 'mentor', 'skill', 'budget'],
+}
+
+
+class TimedBackend(EmbeddingBackend):
+    """Wraps a backend and adds up the time spent embedding"""
+
+    def __init__(self, backend: EmbeddingBackend):
+        self.backend = backend
+        self.model_id = backend.model_id
+        self.batch_size = backend.batch_size
+        self.seconds = 0.0
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        start = time.perf_counter()
+        embeddings = self.backend.embed(texts)
+        self.seconds += time.perf_counter() - start
+        return embeddings
+
+
+class HashingBackend(EmbeddingBackend):
+    """Hashed bag-of-words counts, deterministic and model-free"""
+
+    model_id = 'hashing'
+
+    def __init__(self, dim: int = 256, batch_size: int = 1024):
+        self.dim = dim
+        self.batch_size = batch_size
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in re.findall(r'\w+', text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % self.dim] += 1
+        return vectors + 1e-3
+
+
+def make_pages(num_pages: int, seed: int = 0) -> List[str]:
+    rng = random.Random(seed)
+    names = list(TOPICS)
+    pages = []
+    for _ in range(num_pages):
+        topic = rng.choice(names)
+        sentences = []
+        for _ in range(rng.randint(15, 40)):
+            if rng.random() < 0.15:
+                topic = rng.choice(names)
+            words = rng.choices(TOPICS[topic], k=rng.randint(6, 14))
+            sentences.append(' '.join(words).capitalize() + '.')
+        pages.append(' '.join(sentences))
+    return pages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--pages', type=int, default=10_000)
+    parser.add_argument('--local-model', default=None)
+    parser.add_argument('--buffer-size', type=int, default=1)
+    parser.add_argument('--threshold', type=int, default=95)
+    args = parser.parse_args()
+
+    pages = make_pages(args.pages)
+    if args.local_model:
+        backend = get_backend('local', model_name=args.local_model)
+    else:
+        backend = HashingBackend()
+    backend = TimedBackend(backend)
+
+    llama_splitter = SemanticSplitterNodeParser(
+        buffer_size=args.buffer_size,
+        breakpoint_percentile_threshold=args.threshold,
+        embed_model=BackendEmbedding(backend),
+    )
+    native_splitter = NativeSemanticSplitter(
+        backend,
+        buffer_size=args.buffer_size,
+        breakpoint_percentile_threshold=args.threshold,
+    )
+    # Warm up the sentence tokenizer outside the timings.
+    native_splitter.split(pages[0])
+
+    backend.seconds = 0.0
+    start = time.perf_counter()
+    nodes = llama_splitter.get_nodes_from_documents(
+        [Document(text=page, id_=str(i)) for i, page in enumerate(pages)],
+    )
+    llama_seconds = time.perf_counter() - start
+    llama_embed = backend.seconds
+    llama_chunks: List[List[str]] = [[] for _ in pages]
+    for node in nodes:
+        llama_chunks[int(node.ref_doc_id)].append(node.get_content())
+
+    backend.seconds = 0.0
+    start = time.perf_counter()
+    native_chunks = native_splitter.split_many(pages)
+    native_seconds = time.perf_counter() - start
+    native_embed = backend.seconds
+
+    mismatches = sum(a != b for a, b in zip(llama_chunks, native_chunks))
+    chunks = sum(len(page_chunks) for page_chunks in native_chunks)
+    print(f'{args.pages} pages, {chunks} chunks, backend {backend.model_id}')
+    print('               total s   without embedding s')
+    print(
+        f'  llama_index  {llama_seconds:7.2f}   '
+        f'{llama_seconds - llama_embed:7.2f}',
+    )
+    print(
+        f'  native       {native_seconds:7.2f}   '
+        f'{native_seconds - native_embed:7.2f}',
+    )
+    overhead_speedup = (
+        (llama_seconds - llama_embed) / (native_seconds - native_embed)
+    )
+    print(
+        f'  speedup      {llama_seconds / native_seconds:7.2f}x  '
+        f'{overhead_speedup:7.2f}x',
+    )
+    print(f'  pages with different chunks: {mismatches}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Load generator for the judge HTTP server (main.py serve).
+
+Start a server on a tiny CPU model, then run the load:
+    python main.py serve --model-name sshleifer/tiny-gpt2 \
+        --backend transformers --device cpu
+    PYTHONPATH=. python benchmarks/load_judge_server.py \
+        --url http://127.0.0.1:8000 --requests 500 --concurrency 32
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.stats import percentile
+
+WORDS = 'salary leave policy insurance contract bonus tax holiday'.split()
+
+
+def make_item(rng: random.Random) -> dict:
+    def sentence(low: int, high: int) -> str:
+        return ' '.join(rng.choices(WORDS, k=rng.randint(low, high)))
+
+    return {
+        'query': sentence(5, 20),
+        'chunk': sentence(20, 150),
+        'response': sentence(10, 60),
+    }
+
+
+def post(url: str, payload: dict, timeout: float) -> dict:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode('utf-8'),
+        headers={'Content-Type': 'application/json'},
+    )
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        return json.loads(response.read())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', default='http://127.0.0.1:8000')
+    parser.add_argument('--requests', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument(
+        '--batch', type=int, default=0,
+        help='Items per /judge/batch call; 0 uses /judge',
+    )
+    parser.add_argument('--timeout', type=float, default=300.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    lock = threading.Lock()
+    latencies = []
+    errors = 0
+
+    def one(_: int) -> None:
+        nonlocal errors
+        with lock:
+            if args.batch:
+                items = [make_item(rng) for _ in range(args.batch)]
+            else:
+                item = make_item(rng)
+        start = time.perf_counter()
+        try:
+            if args.batch:
+                post(f'{args.url}/judge/batch', {'items': items}, args.timeout)
+            else:
+                post(f'{args.url}/judge', item, args.timeout)
+        except Exception:
+            with lock:
+                errors += 1
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.requests)))
+    elapsed = time.perf_counter() - start
+
+    verdicts = len(latencies) * (args.batch or 1)
+    print(f'requests:    {args.requests} ({errors} errors)')
+    print(f'elapsed:     {elapsed:.2f}s')
+    print(f'throughput:  {verdicts / elapsed:.1f} verdicts/s')
+    for q in (50, 90, 99, 99.9):
+        print(f'p{q:<10} {1000 * percentile(latencies, q):.1f}ms')
+    with urllib.request.urlopen(f'{args.url}/metrics') as response:
+        print('server:     ', response.read().decode('utf-8'))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
+import time
 from pathlib import Path
+from typing import Optional
 
 import typer
-from src.data.data_processor import DataProcessor
-from src.model.model_utils import ModelUtils
-from src.training.trainer import ModelTrainer
+from src.components.data_pre.cache import DatasetCache
+from src.components.data_pre.cache import DEFAULT_CACHE_DIR
 from src.utils.logging import setup_logging
 
 app = typer.Typer()
+cache_app = typer.Typer(help='Inspect and prune the processed dataset cache.')
+app.add_typer(cache_app, name='cache')
 
 
 @app.command()
@@ -19,6 +22,9 @@ def prepare_data(
     max_seq_length: int = typer.Option(512, help='Maximum sequence length'),
 ):
     """Prepare data for fine-tuning."""
+    from src.data.data_processor import DataProcessor
+    from src.model.model_utils import ModelUtils
+
     setup_logging()
 
     # Load model and tokenizer
@@ -47,6 +53,10 @@ def train(
     use_wandb: bool = typer.Option(True, help='Use Weights & Biases'),
 ):
     """Fine-tune the model."""
+    from src.data.data_processor import DataProcessor
+    from src.model.model_utils import ModelUtils
+    from src.training.trainer import ModelTrainer
+
     setup_logging()
 
     # Load model and tokenizer
@@ -86,6 +96,10 @@ def evaluate(
     ),
 ):
     """Evaluate the fine-tuned model."""
+    from src.data.data_processor import DataProcessor
+    from src.model.model_utils import ModelUtils
+    from src.training.trainer import ModelTrainer
+
     setup_logging()
 
     # Load model and tokenizer
@@ -111,5 +125,280 @@ def evaluate(
             f.write(f'{key}: {value}\n')
 
 
+@app.command()
+def serve(
+    model_name: str = typer.Option(..., help='Fine-tuned judge model path'),
+    backend: str = typer.Option(
+        'unsloth', help="'unsloth' (GPU) or 'transformers' (any device)",
+    ),
+    device: str = typer.Option('cuda', help='Device to run the model on'),
+    mode: str = typer.Option(
+        'with_context', help="'with_context' or 'without_context' prompt",
+    ),
+    host: str = typer.Option('127.0.0.1', help='Address to bind'),
+    port: int = typer.Option(8000, help='Port to bind'),
+    max_batch_size: int = typer.Option(32, help='Requests per batch'),
+    max_batch_tokens: int = typer.Option(32768, help='Tokens per batch'),
+    max_wait_ms: float = typer.Option(
+        10.0, help='Longest wait for a batch to fill',
+    ),
+    cache_db: Optional[str] = typer.Option(
+        None, help='SQLite file caching verdicts across runs',
+    ),
+    cache_ttl_hours: Optional[float] = typer.Option(
+        None, help='Expire cached verdicts after this many hours',
+    ),
+    load_in_4bit: bool = typer.Option(False, help='Load the model in 4-bit'),
+):
+    """Serve judge verdicts over HTTP."""
+    from src.components.data_pre.sft_judge import SFTJudge
+    from src.components.inference.engine import JudgeEngine
+    from src.components.inference.memo import model_identity
+    from src.components.inference.memo import VerdictCache
+    from src.components.inference.server import serve as serve_http
+    from src.components.load_model.load_modules import ModelManager
+
+    setup_logging()
+
+    model_manager = ModelManager()
+    model_manager.load_model(
+        model_name,
+        load_in_4bit=load_in_4bit,
+        backend=backend,
+        device=device,
+    )
+    cache = VerdictCache(
+        model_identity(model_manager.get_model(), model_name),
+        db_path=cache_db,
+        ttl_seconds=cache_ttl_hours * 3600 if cache_ttl_hours else None,
+    )
+    engine = JudgeEngine.from_model_manager(
+        model_manager,
+        device=device,
+        prompt_base=SFTJudge().template_for(mode),
+        max_batch_size=max_batch_size,
+        max_batch_tokens=max_batch_tokens,
+        max_wait_ms=max_wait_ms,
+        cache=cache,
+    )
+    serve_http(engine, host=host, port=port)
+
+
+@app.command()
+def judge_file(
+    model_name: str = typer.Option(..., help='Fine-tuned judge model path'),
+    input_path: str = typer.Option(
+        ..., help='CSV/JSONL file with query, chunk and response columns',
+    ),
+    output_path: str = typer.Option(..., help='JSONL file for the verdicts'),
+    backend: str = typer.Option(
+        'unsloth', help="'unsloth' (GPU) or 'transformers' (any device)",
+    ),
+    device: str = typer.Option('cuda', help='Device to run the model on'),
+    mode: str = typer.Option(
+        'with_context', help="'with_context' or 'without_context' prompt",
+    ),
+    batch_size: int = typer.Option(256, help='Rows scored per batch'),
+    prefetch: int = typer.Option(4, help='Batches read ahead of the model'),
+    max_batch_tokens: int = typer.Option(
+        32768, help='Tokens per forward pass',
+    ),
+    keep_columns: str = typer.Option(
+        '', help='Comma-separated input columns copied to the output',
+    ),
+    resume: bool = typer.Option(True, help='Resume from the checkpoint'),
+    cache_db: Optional[str] = typer.Option(
+        None, help='SQLite file caching verdicts across runs',
+    ),
+    cache_ttl_hours: Optional[float] = typer.Option(
+        None, help='Expire cached verdicts after this many hours',
+    ),
+    load_in_4bit: bool = typer.Option(False, help='Load the model in 4-bit'),
+):
+    """Judge every row of a CSV/JSONL file, resumably."""
+    from src.components.data_pre.sft_judge import SFTJudge
+    from src.components.inference.bulk import judge_file as run_judge_file
+    from src.components.inference.infer import Inference
+    from src.components.inference.memo import model_identity
+    from src.components.inference.memo import VerdictCache
+    from src.components.load_model.load_modules import ModelManager
+
+    setup_logging()
+
+    model_manager = ModelManager()
+    model_manager.load_model(
+        model_name,
+        load_in_4bit=load_in_4bit,
+        backend=backend,
+        device=device,
+    )
+    inference = Inference(device=device, prefix_cache=True)
+    inference.get_model(
+        model_manager.get_model(), model_manager.get_tokenizer(),
+    )
+    cache = VerdictCache(
+        model_identity(model_manager.get_model(), model_name),
+        db_path=cache_db,
+        ttl_seconds=cache_ttl_hours * 3600 if cache_ttl_hours else None,
+    )
+    rows = run_judge_file(
+        inference,
+        input_path,
+        output_path,
+        prompt_base=SFTJudge().template_for(mode),
+        batch_size=batch_size,
+        prefetch=prefetch,
+        max_batch_tokens=max_batch_tokens,
+        keep_columns=[c for c in keep_columns.split(',') if c],
+        resume=resume,
+        cache=cache,
+    )
+    typer.echo(f'Judged {rows} rows into {output_path}')
+
+
+@app.command()
+def chunk_corpus(
+    input_dir: str = typer.Option(
+        ..., help='Directory of .txt/.md documents to chunk',
+    ),
+    output_path: str = typer.Option(
+        ..., help='.jsonl or .parquet file for the chunks',
+    ),
+    embedding_backend: str = typer.Option(
+        'local', help="'local' (sentence-transformers) or 'openai'",
+    ),
+    embedding_model: str = typer.Option(
+        'sentence-transformers/all-MiniLM-L6-v2',
+        help='Model of the local backend',
+    ),
+    device: str = typer.Option('cpu', help='Device of the local backend'),
+    buffer_size: int = typer.Option(1, help='Sentences around each window'),
+    threshold: float = typer.Option(
+        95, help='Breakpoint distance percentile',
+    ),
+    num_workers: Optional[int] = typer.Option(
+        None, help='Sentence-splitting processes, all CPUs by default',
+    ),
+    batch_windows: int = typer.Option(
+        4096, help='Sentence windows embedded per call',
+    ),
+):
+    """Semantically chunk a corpus of documents."""
+    from src.components.chunking.embeddings import get_backend
+    from src.components.chunking.pipeline import ChunkingPipeline
+
+    setup_logging()
+
+    if embedding_backend == 'local':
+        backend = get_backend(
+            'local', model_name=embedding_model, device=device,
+        )
+    else:
+        backend = get_backend(embedding_backend)
+    pipeline = ChunkingPipeline(
+        backend,
+        buffer_size=buffer_size,
+        breakpoint_percentile_threshold=threshold,
+        num_workers=num_workers,
+        batch_windows=batch_windows,
+    )
+    count = pipeline.run(input_dir, output_path)
+    typer.echo(f'Wrote {count} chunks to {output_path}')
+
+
+@app.command()
+def ingest(
+    source_dir: str = typer.Option(..., help='Directory of source documents'),
+    store_dir: str = typer.Option(
+        ..., help='Directory of the manifest and chunk shards',
+    ),
+    embedding_backend: str = typer.Option(
+        'openai', help="'openai' or 'local' (sentence-transformers)",
+    ),
+    embedding_model: str = typer.Option(
+        'sentence-transformers/all-MiniLM-L6-v2',
+        help='Model of the local backend',
+    ),
+    device: str = typer.Option('cpu', help='Device of the local backend'),
+    watch: bool = typer.Option(False, help='Keep syncing on changes'),
+    interval: float = typer.Option(5.0, help='Seconds between scans'),
+):
+    """Incrementally parse and chunk changed source documents."""
+    from src.components.chunking.embeddings import get_backend
+    from src.components.chunking.llamaindex import LlamaIndexChunker
+    from src.pipeline.ingest import IncrementalIngestor
+
+    setup_logging()
+
+    backend = None
+    if embedding_backend == 'local':
+        backend = get_backend(
+            'local', model_name=embedding_model, device=device,
+        )
+    elif embedding_backend != 'openai':
+        backend = get_backend(embedding_backend)
+    ingestor = IncrementalIngestor(
+        source_dir,
+        store_dir,
+        chunker=LlamaIndexChunker(embedding_backend=backend),
+    )
+    if not watch:
+        report = ingestor.sync()
+        typer.echo(
+            f'{report.added} added, {report.modified} modified, '
+            f'{report.removed} removed, {len(report.failed)} failed',
+        )
+        return
+    try:
+        ingestor.watch(interval=interval)
+    except KeyboardInterrupt:
+        pass
+
+
+@cache_app.command('ls')
+def cache_ls(
+    cache_dir: str = typer.Option(
+        DEFAULT_CACHE_DIR, help='Dataset cache directory',
+    ),
+):
+    """List cached datasets, most recently used first."""
+    cache = DatasetCache(cache_dir, max_size_gb=None)
+    entries = cache.entries()
+    for entry in entries:
+        typer.echo(
+            f'{entry.key[:16]}  {entry.size / 1024**2:10.1f}MB  '
+            f'{time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.last_access))}  '
+            f'{entry.meta.get("num_rows", "?")} rows  '
+            f'{entry.meta.get("source", "")} ({entry.meta.get("mode", "")})',
+        )
+    total = sum(entry.size for entry in entries)
+    typer.echo(f'{len(entries)} entries, {total / 1024**2:.1f}MB total')
+
+
+@cache_app.command('prune')
+def cache_prune(
+    cache_dir: str = typer.Option(
+        DEFAULT_CACHE_DIR, help='Dataset cache directory',
+    ),
+    max_size_gb: Optional[float] = typer.Option(
+        None, help='Evict least recently used entries above this size',
+    ),
+    older_than_days: Optional[float] = typer.Option(
+        None, help='Evict entries unused for this many days',
+    ),
+    all_entries: bool = typer.Option(
+        False, '--all', help='Remove every entry',
+    ),
+):
+    """Evict cached datasets."""
+    cache = DatasetCache(cache_dir, max_size_gb=None)
+    removed = cache.prune(
+        max_size_gb=0 if all_entries else max_size_gb,
+        older_than_days=older_than_days,
+    )
+    freed = sum(entry.size for entry in removed)
+    typer.echo(f'Removed {len(removed)} entries, freed {freed / 1024**2:.1f}MB')
+
+
 if __name__ == '__main__':
     app()
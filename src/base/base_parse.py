@@ -1,9 +1,14 @@
 from __future__ import annotations
 
 from abc import abstractmethod
+from typing import Any
+from typing import Dict
 from typing import List
+from typing import Optional
 from typing import Union
 
+from pydantic import Field
+
 from ..models import FileType
 from .base_model import CustomBaseModel as BaseModel
 
@@ -19,11 +24,20 @@ class ParseOutput(BaseModel):
     """Output for parsing"""
 
     parsed_data: str
+    source: Optional[str] = None
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+    error: Optional[str] = None
 
 
 class BaseParse:
     """Base class for parsing"""
 
+    # Parsers that mostly wait on disk or network run in threads; set to
+    # False for CPU-bound parsers so batch parsing uses processes.
+    io_bound: bool = True
+    # Part of parse cache keys: bump it whenever the parsed text changes.
+    version: str = '1'
+
     @abstractmethod
     def parse(self, input: ParseInput) -> ParseOutput:
         """Parse the input"""
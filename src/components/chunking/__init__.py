@@ -1,25 +1,64 @@
 from __future__ import annotations
 
-import os
+from functools import lru_cache
+from typing import Any
+from typing import Optional
 
-from llama_index.core.node_parser import SemanticSplitterNodeParser
-from llama_index.core.node_parser import SentenceSplitter
-from llama_index.embeddings.openai import OpenAIEmbedding
+# Embedders and splitters are built on first use: importing this package
+# must not need llama_index, network access or an OpenAI key.
 
-os.environ['OPENAI_API_KEY'] = 'sk-...'
 
-embed_model = OpenAIEmbedding()
-splitter = SemanticSplitterNodeParser(
-    buffer_size=1, breakpoint_percentile_threshold=95, embed_model=embed_model,
-)
+@lru_cache(maxsize=None)
+def get_embed_model(api_key: Optional[str] = None) -> Any:
+    """OpenAI embedding model; without `api_key` it reads OPENAI_API_KEY"""
+    from llama_index.embeddings.openai import OpenAIEmbedding
 
-# also baseline splitter
-base_splitter = SentenceSplitter(chunk_size=512)
+    return OpenAIEmbedding(api_key=api_key)
 
-embed_model = OpenAIEmbedding()
-splitter = SemanticSplitterNodeParser(
-    buffer_size=1, breakpoint_percentile_threshold=95, embed_model=embed_model,
-)
 
-# also baseline splitter
-base_splitter = SentenceSplitter(chunk_size=512)
+@lru_cache(maxsize=None)
+def get_splitter(
+    buffer_size: int = 1,
+    breakpoint_percentile_threshold: int = 95,
+    api_key: Optional[str] = None,
+    embedding_backend: Any = None,
+) -> Any:
+    """Semantic splitter, built once per configuration
+
+    Sentence windows are embedded with `embedding_backend` when given,
+    otherwise with OpenAI.
+    """
+    from src.components.chunking.llamaindex import BackendEmbedding
+    from src.components.chunking.llamaindex import BatchedSemanticSplitter
+
+    if embedding_backend is not None:
+        embed_model = BackendEmbedding(embedding_backend)
+    else:
+        embed_model = get_embed_model(api_key)
+    return BatchedSemanticSplitter(
+        buffer_size=buffer_size,
+        breakpoint_percentile_threshold=breakpoint_percentile_threshold,
+        embed_model=embed_model,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_base_splitter(chunk_size: int = 512) -> Any:
+    """Baseline sentence splitter, built once per chunk size"""
+    from llama_index.core.node_parser import SentenceSplitter
+
+    return SentenceSplitter(chunk_size=chunk_size)
+
+
+_LAZY_ATTRIBUTES = {
+    'embed_model': get_embed_model,
+    'splitter': get_splitter,
+    'base_splitter': get_base_splitter,
+}
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from src.components.chunking import splitter` working.
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import contextlib
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+
+import numpy as np
+from src.components.chunking.embeddings import EmbeddingBackend
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser('~'), '.cache', 'rasun', 'embeddings',
+)
+
+
+def embedding_key(model_id: str, text: str) -> str:
+    return hashlib.sha256(f'{model_id}\0{text}'.encode('utf-8')).hexdigest()
+
+
+_ROW_DIGITS = 12
+# sha256 hex key, a space, the zero-padded row and a newline.
+_KEY_RECORD = 64 + 1 + _ROW_DIGITS + 1
+
+
+class _DiskTier:
+    """Append-only float32 matrix of one model's vectors
+
+    `vectors.f32` holds the rows and is read through np.memmap,
+    `keys.idx` holds fixed-width `<key> <row>` records. Appends hold an
+    exclusive flock on `lock`, take the next row from the size of
+    `vectors.f32` and write the vectors before their keys, so a row or
+    record torn by a crash is ignored and later records stay aligned.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.vectors_path = os.path.join(path, 'vectors.f32')
+        self.keys_path = os.path.join(path, 'keys.idx')
+        self.meta_path = os.path.join(path, 'meta.json')
+        self.lock_path = os.path.join(path, 'lock')
+        self.rows: Dict[str, int] = {}
+        self.dim: Optional[int] = None
+        self.keys_read = 0
+        self._mmap: Optional[np.memmap] = None
+        if os.path.exists(self.meta_path):
+            with self._locked(fcntl.LOCK_SH):
+                self._refresh()
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @contextlib.contextmanager
+    def _locked(self, operation: int) -> Iterator[None]:
+        os.makedirs(self.path, exist_ok=True)
+        with open(self.lock_path, 'a') as f:
+            fcntl.flock(f, operation)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _num_rows(self) -> int:
+        if not os.path.exists(self.vectors_path):
+            return 0
+        return os.path.getsize(self.vectors_path) // (4 * self.dim)
+
+    def _refresh(self) -> None:
+        """Read key records written since the last refresh, by any writer"""
+        if self.dim is None:
+            if not os.path.exists(self.meta_path):
+                return
+            with open(self.meta_path) as f:
+                self.dim = json.load(f)['dim']
+        if not os.path.exists(self.keys_path):
+            return
+        num_rows = self._num_rows()
+        with open(self.keys_path, 'rb') as f:
+            f.seek(self.keys_read * _KEY_RECORD)
+            data = f.read()
+        for offset in range(0, len(data) - _KEY_RECORD + 1, _KEY_RECORD):
+            record = data[offset:offset + _KEY_RECORD].decode(
+                'ascii', 'replace',
+            )
+            key, _, row = record[:-1].partition(' ')
+            if record[-1] == '\n' and row.isdigit() and int(row) < num_rows:
+                self.rows[key] = int(row)
+        self.keys_read += len(data) // _KEY_RECORD
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        row = self.rows.get(key)
+        if row is None:
+            return None
+        if self._mmap is None or row >= self._mmap.shape[0]:
+            # Whole rows only: the file can end in a row torn by a crash or
+            # still being written by another process.
+            self._mmap = np.memmap(
+                self.vectors_path,
+                dtype=np.float32,
+                mode='r',
+                shape=(self._num_rows(), self.dim),
+            )
+        return np.array(self._mmap[row])
+
+    def append(self, keys: List[str], vectors: np.ndarray) -> None:
+        with self._locked(fcntl.LOCK_EX):
+            self._refresh()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self.meta_path, 'w') as f:
+                    json.dump({'dim': self.dim}, f)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f'Embedding dim {vectors.shape[1]} does not match the '
+                    f'cached dim {self.dim} in {self.path}',
+                )
+            start = self._num_rows()
+            with open(self.vectors_path, 'ab') as f:
+                # Only a crashed writer leaves a partial row under the lock.
+                f.truncate(start * 4 * self.dim)
+                f.write(
+                    np.ascontiguousarray(vectors, dtype=np.float32).tobytes(),
+                )
+            records = ''.join(
+                f'{key} {start + offset:0{_ROW_DIGITS}d}\n'
+                for offset, key in enumerate(keys)
+            )
+            with open(self.keys_path, 'ab') as f:
+                f.truncate(self.keys_read * _KEY_RECORD)
+                f.write(records.encode('ascii'))
+            self._refresh()
+
+
+class EmbeddingCache:
+    """Sentence-window embeddings keyed by sha256(model id + text)
+
+    Recent vectors are kept in an in-memory LRU. With `cache_dir`, every
+    vector is also appended to a memory-mapped file per model, so later
+    runs only embed text they have not seen.
+    """
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_entries: int = 200_000,
+    ):
+        self.cache_dir = cache_dir
+        self.max_memory_entries = max_memory_entries
+        self.memory: OrderedDict = OrderedDict()
+        self.disk: Dict[str, _DiskTier] = {}
+        self.lock = threading.Lock()
+        self.counts = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+
+    def _disk_tier(self, model_id: str) -> Optional[_DiskTier]:
+        if self.cache_dir is None:
+            return None
+        if model_id not in self.disk:
+            name = hashlib.sha256(model_id.encode('utf-8')).hexdigest()[:16]
+            self.disk[model_id] = _DiskTier(
+                os.path.join(self.cache_dir, name),
+            )
+        return self.disk[model_id]
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        self.memory[key] = vector
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_memory_entries:
+            self.memory.popitem(last=False)
+
+    def get_many(
+        self, model_id: str, texts: List[str],
+    ) -> List[Optional[np.ndarray]]:
+        """Cached vector of each text, None where it is not cached"""
+        with self.lock:
+            disk = self._disk_tier(model_id)
+            vectors: List[Optional[np.ndarray]] = []
+            for text in texts:
+                key = embedding_key(model_id, text)
+                if key in self.memory:
+                    self.memory.move_to_end(key)
+                    self.counts['memory_hits'] += 1
+                    vector = self.memory[key]
+                else:
+                    vector = disk.get(key) if disk is not None else None
+                    if vector is None:
+                        self.counts['misses'] += 1
+                    else:
+                        self._remember(key, vector)
+                        self.counts['disk_hits'] += 1
+                vectors.append(vector)
+            return vectors
+
+    def put_many(
+        self, model_id: str, texts: List[str], vectors: np.ndarray,
+    ) -> None:
+        with self.lock:
+            disk = self._disk_tier(model_id)
+            keys = [embedding_key(model_id, text) for text in texts]
+            for key, vector in zip(keys, vectors):
+                self._remember(key, vector)
+            if disk is not None:
+                new = {
+                    key: row for row, key in enumerate(keys)
+                    if key not in disk.rows
+                }
+                if new:
+                    disk.append(list(new), vectors[list(new.values())])
+
+    def metrics(self) -> Dict[str, float]:
+        with self.lock:
+            counts = dict(self.counts)
+            lookups = sum(counts.values())
+            hits = counts['memory_hits'] + counts['disk_hits']
+            return {
+                **counts,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'memory_entries': len(self.memory),
+            }
+
+
+class CachedEmbeddingBackend(EmbeddingBackend):
+    """Embedding backend that only embeds texts missing from a cache"""
+
+    def __init__(self, backend: EmbeddingBackend, cache: EmbeddingCache):
+        self.backend = backend
+        self.cache = cache
+        self.model_id = backend.model_id
+        self.batch_size = backend.batch_size
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = self.cache.get_many(self.model_id, texts)
+        missing = list(
+            dict.fromkeys(
+                text for text, vector in zip(texts, vectors) if vector is None
+            ),
+        )
+        if missing:
+            embedded = self.backend.embed(missing)
+            self.cache.put_many(self.model_id, missing, embedded)
+            by_text = dict(zip(missing, embedded))
+            vectors = [
+                vector if vector is not None else by_text[text]
+                for text, vector in zip(texts, vectors)
+            ]
+        if not vectors:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.stack(vectors).astype(np.float32, copy=False)
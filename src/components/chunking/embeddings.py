@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import logging
+from abc import ABC
+from abc import abstractmethod
+from typing import Any
+from typing import List
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend(ABC):
+    """Turns a batch of texts into a (len(texts), dim) float32 array
+
+    Attributes:
+        model_id (str): Identifies the model, e.g. for cache keys.
+        batch_size (int): Texts sent to the model per call.
+    """
+
+    model_id: str = ''
+    batch_size: int = 64
+
+    @abstractmethod
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed `texts`, one float32 row per text"""
+        pass
+
+
+class OpenAIBackend(EmbeddingBackend):
+    """Remote OpenAI embeddings, one request per `batch_size` texts"""
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        model: str = 'text-embedding-ada-002',
+        batch_size: int = 100,
+    ):
+        from llama_index.embeddings.openai import OpenAIEmbedding
+
+        self.model_id = f'openai:{model}'
+        self.batch_size = batch_size
+        self.client = OpenAIEmbedding(
+            api_key=api_key, model=model, embed_batch_size=batch_size,
+        )
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        embeddings = self.client.get_text_embedding_batch(texts)
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """Local sentence-transformers model, encoded in batches on CPU or GPU
+
+    Extra keyword arguments go to `SentenceTransformer`, e.g.
+    `backend='onnx'` to run an exported ONNX model.
+    """
+
+    def __init__(
+        self,
+        model_name: str = 'sentence-transformers/all-MiniLM-L6-v2',
+        device: str = 'cpu',
+        batch_size: int = 64,
+        normalize: bool = True,
+        **model_kwargs: Any,
+    ):
+        from sentence_transformers import SentenceTransformer
+
+        self.model_id = f'sentence-transformers:{model_name}'
+        self.batch_size = batch_size
+        self.normalize = normalize
+        self.model = SentenceTransformer(
+            model_name, device=device, **model_kwargs,
+        )
+        logger.info('Loaded embedding model %s on %s', model_name, device)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        embeddings = self.model.encode(
+            texts,
+            batch_size=self.batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=self.normalize,
+            show_progress_bar=False,
+        )
+        return embeddings.astype(np.float32, copy=False)
+
+
+BACKENDS = {
+    'openai': OpenAIBackend,
+    'local': SentenceTransformerBackend,
+}
+
+
+def get_backend(name: str, **kwargs: Any) -> EmbeddingBackend:
+    """Build an embedding backend by name ('openai' or 'local')"""
+    if name not in BACKENDS:
+        raise ValueError(
+            f'Unknown embedding backend {name!r}, '
+            f'expected one of {sorted(BACKENDS)}',
+        )
+    return BACKENDS[name](**kwargs)
@@ -1,28 +1,183 @@
 from __future__ import annotations
 
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any
+from typing import Iterator
 from typing import List
+from typing import Optional
+from typing import Sequence
 
 from llama_index.core import Document
+from llama_index.core.base.embeddings.base import BaseEmbedding
 from llama_index.core.node_parser import SemanticSplitterNodeParser
+from llama_index.core.node_parser.node_utils import build_nodes_from_splits
+from llama_index.core.schema import BaseNode
 from llama_index.embeddings.openai import OpenAIEmbedding
+from pydantic import PrivateAttr
+from src.components.chunking.embedding_cache import CachedEmbeddingBackend
+from src.components.chunking.embedding_cache import EmbeddingCache
+from src.components.chunking.embeddings import EmbeddingBackend
+from src.components.chunking.embeddings import OpenAIBackend
+
+
+class BackendEmbedding(BaseEmbedding):
+    """llama_index embedding model backed by an EmbeddingBackend"""
+
+    _backend: EmbeddingBackend = PrivateAttr()
+
+    def __init__(self, backend: EmbeddingBackend, **kwargs: Any):
+        super().__init__(
+            model_name=backend.model_id,
+            embed_batch_size=backend.batch_size,
+            **kwargs,
+        )
+        self._backend = backend
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._backend.embed(texts).tolist()
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._get_text_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._get_query_embedding(query)
+
+
+class BatchedSemanticSplitter(SemanticSplitterNodeParser):
+    """SemanticSplitterNodeParser embedding all documents of a call at once
+
+    The parent embeds the sentence windows of one document at a time. Here
+    the windows of every document passed to `get_nodes_from_documents` go
+    to the embedding model together, so requests are filled up to
+    `embed_batch_size` across document boundaries. Chunks are identical.
+    """
+
+    def _parse_nodes(
+        self,
+        nodes: Sequence[BaseNode],
+        show_progress: bool = False,
+        **kwargs: Any,
+    ) -> List[BaseNode]:
+        groups = [
+            self._build_sentence_groups(self.sentence_splitter(node.text))
+            for node in nodes
+        ]
+        embeddings = self.embed_model.get_text_embedding_batch(
+            [
+                sentence['combined_sentence']
+                for sentences in groups
+                for sentence in sentences
+            ],
+            show_progress=show_progress,
+        )
+        all_nodes: List[BaseNode] = []
+        position = 0
+        for node, sentences in zip(nodes, groups):
+            for sentence in sentences:
+                sentence['combined_sentence_embedding'] = embeddings[position]
+                position += 1
+            distances = self._calculate_distances_between_sentence_groups(
+                sentences,
+            )
+            all_nodes.extend(
+                build_nodes_from_splits(
+                    self._build_node_chunks(sentences, distances),
+                    node,
+                    id_func=self.id_func,
+                ),
+            )
+        return all_nodes
 
 
 class LlamaIndexChunker:
-    def __init__(self, api_key: str):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        embedding_backend: Optional[EmbeddingBackend] = None,
+        pool_size: int = 4,
+        buffer_size: int = 1,
+        breakpoint_percentile_threshold: int = 95,
+        embedding_cache: Optional[EmbeddingCache] = None,
+    ):
+        """
+        Args:
+            api_key (str, optional): OpenAI key, used without a backend.
+            embedding_backend (EmbeddingBackend, optional): Embeds the
+                sentence windows instead of OpenAI, e.g. a local model.
+            pool_size (int): Splitters, each with its own embedding client,
+                shared by concurrent callers. Built on first use and kept
+                for the lifetime of the chunker.
+            buffer_size (int): Neighbouring sentences in each window.
+            breakpoint_percentile_threshold (int): Distance percentile
+                above which a chunk is closed.
+            embedding_cache (EmbeddingCache, optional): Reuses sentence-window
+                embeddings, so re-chunking with another threshold or buffer
+                size only embeds windows not seen before.
+        """
         self.api_key = api_key
+        if embedding_cache is not None:
+            embedding_backend = CachedEmbeddingBackend(
+                embedding_backend or OpenAIBackend(api_key=api_key),
+                embedding_cache,
+            )
+        self.embedding_backend = embedding_backend
+        self.pool_size = pool_size
+        self.buffer_size = buffer_size
+        self.breakpoint_percentile_threshold = breakpoint_percentile_threshold
+        self._pool: queue.Queue = queue.Queue()
+        self._pool_lock = threading.Lock()
+        self._pool_created = 0
 
-    def _embedding_client(self) -> OpenAIEmbedding:
+    def _embedding_client(self) -> BaseEmbedding:
+        if self.embedding_backend is not None:
+            return BackendEmbedding(self.embedding_backend)
         return OpenAIEmbedding(api_key=self.api_key)
 
     def _splitter(self) -> SemanticSplitterNodeParser:
-        return SemanticSplitterNodeParser(
-            buffer_size=1,
-            breakpoint_percentile_threshold=95,
+        return BatchedSemanticSplitter(
+            buffer_size=self.buffer_size,
+            breakpoint_percentile_threshold=(
+                self.breakpoint_percentile_threshold
+            ),
             embed_model=self._embedding_client(),
         )
 
+    @contextmanager
+    def _borrow(self) -> Iterator[SemanticSplitterNodeParser]:
+        """Take a splitter from the pool, building one if it is not full"""
+        try:
+            splitter = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                build = self._pool_created < self.pool_size
+                if build:
+                    self._pool_created += 1
+            splitter = self._splitter() if build else self._pool.get()
+        try:
+            yield splitter
+        finally:
+            self._pool.put(splitter)
+
     def chunk_text(self, text: str) -> List[str]:
-        nodes = self._splitter().get_nodes_from_documents(
-            documents=[Document(text=text)],
-        )
-        return [node.get_content() for node in nodes]
+        return self.chunk_many([text])[0]
+
+    def chunk_many(self, texts: Sequence[str]) -> List[List[str]]:
+        """Chunk many texts with one splitter call and batched embeddings
+
+        Returns:
+            List[List[str]]: Chunks of each text, in input order.
+        """
+        documents = [
+            Document(text=text, id_=str(i)) for i, text in enumerate(texts)
+        ]
+        with self._borrow() as splitter:
+            nodes = splitter.get_nodes_from_documents(documents=documents)
+        chunks: List[List[str]] = [[] for _ in documents]
+        for node in nodes:
+            chunks[int(node.ref_doc_id)].append(node.get_content())
+        return chunks
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import json
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from dataclasses import dataclass
+from functools import partial
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+from typing import Union
+
+import numpy as np
+import pyarrow as pa
+import pyarrow.parquet as pq
+from src.components.chunking.embeddings import EmbeddingBackend
+from src.components.chunking.semantic import NativeSemanticSplitter
+from src.components.chunking.semantic import sentence_starts
+
+logger = logging.getLogger(__name__)
+
+Document = Tuple[str, str]
+
+CHUNK_SCHEMA = pa.schema(
+    [
+        ('doc_id', pa.string()),
+        ('chunk_id', pa.int32()),
+        ('start', pa.int64()),
+        ('end', pa.int64()),
+        ('text', pa.large_string()),
+    ],
+)
+
+
+@dataclass
+class ChunkRecord:
+    """One chunk and its character span in the source document"""
+
+    doc_id: str
+    chunk_id: int
+    start: int
+    end: int
+    text: str
+
+
+def iter_documents(
+    source: Union[str, Iterable[Union[str, Document]]],
+    suffixes: Tuple[str, ...] = ('.txt', '.md'),
+) -> Iterator[Document]:
+    """(doc_id, text) pairs from a directory or a list of documents
+
+    A directory is walked in sorted order and every file with one of
+    `suffixes` becomes a document named by its relative path. In a list,
+    plain strings are named by their position.
+    """
+    if isinstance(source, str):
+        paths = []
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            paths.extend(
+                os.path.join(root, name)
+                for name in sorted(files) if name.endswith(suffixes)
+            )
+        for path in paths:
+            with open(path, encoding='utf-8', errors='replace') as f:
+                yield os.path.relpath(path, source), f.read()
+        return
+    for i, document in enumerate(source):
+        if isinstance(document, str):
+            yield str(i), document
+        else:
+            yield document
+
+
+def ordered_map(
+    executor: Optional[Executor],
+    function: Callable,
+    items: Iterable,
+    max_pending: int,
+) -> Iterator:
+    """Like executor.map, but submits at most `max_pending` items ahead
+
+    Results come back in input order. Without an executor the function runs
+    in this process.
+    """
+    if executor is None:
+        yield from map(function, items)
+        return
+    pending: deque = deque()
+    for item in items:
+        pending.append(executor.submit(function, item))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def _starts_of(text: str, span_tokenize: Callable) -> np.ndarray:
+    return sentence_starts(text, span_tokenize)
+
+
+class ChunkingPipeline:
+    """Semantic chunking of a whole corpus
+
+    Sentence splitting, the CPU-heavy part, runs in a process pool that
+    only receives each document's text and returns its sentence starts.
+    The pool is spawned rather than forked, since the parent may already
+    run threads of a torch or sentence-transformers backend. Results are
+    consumed in input order and grouped until they hold
+    `batch_windows` sentence windows; each group is embedded with a single
+    backend call and its chunks are yielded in input order, so the output
+    is the same for any number of workers.
+    """
+
+    def __init__(
+        self,
+        backend: EmbeddingBackend,
+        buffer_size: int = 1,
+        breakpoint_percentile_threshold: float = 95,
+        num_workers: Optional[int] = None,
+        batch_windows: int = 4096,
+    ):
+        """
+        Args:
+            backend (EmbeddingBackend): Embeds the sentence windows.
+            buffer_size (int): Neighbouring sentences in each window.
+            breakpoint_percentile_threshold (float): Distance percentile
+                above which a chunk is closed.
+            num_workers (int, optional): Sentence-splitting processes. All
+                available CPUs if None; 0 splits in this process.
+            batch_windows (int): Sentence windows embedded per backend call.
+        """
+        self.splitter = NativeSemanticSplitter(
+            backend,
+            buffer_size=buffer_size,
+            breakpoint_percentile_threshold=breakpoint_percentile_threshold,
+        )
+        if num_workers is None:
+            num_workers = (
+                len(os.sched_getaffinity(0))
+                if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+            )
+        self.num_workers = num_workers
+        self.batch_windows = batch_windows
+
+    def _chunk_batch(
+        self, batch: List[Tuple[Document, np.ndarray]],
+    ) -> Iterator[ChunkRecord]:
+        texts = [text for (_, text), _ in batch]
+        spans = self.splitter.spans_many(
+            texts, starts=[starts for _, starts in batch],
+        )
+        for ((doc_id, text), _), doc_spans in zip(batch, spans):
+            for chunk_id, (start, end) in enumerate(doc_spans):
+                yield ChunkRecord(
+                    doc_id, chunk_id, start, end, text[start:end],
+                )
+
+    def iter_chunks(
+        self, source: Union[str, Iterable[Union[str, Document]]],
+    ) -> Iterator[ChunkRecord]:
+        """Chunks of every document in `source`, in document order"""
+        split = partial(
+            _starts_of, span_tokenize=self.splitter.span_tokenize,
+        )
+        executor = (
+            ProcessPoolExecutor(
+                max_workers=self.num_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+            if self.num_workers > 1 else None
+        )
+        # Documents whose text is out with the workers, in input order.
+        documents: deque = deque()
+
+        def texts() -> Iterator[str]:
+            for document in iter_documents(source):
+                documents.append(document)
+                yield document[1]
+
+        try:
+            results = ordered_map(
+                executor,
+                split,
+                texts(),
+                max_pending=4 * max(1, self.num_workers),
+            )
+            batch: List[Tuple[Document, np.ndarray]] = []
+            windows = 0
+            for starts in results:
+                batch.append((documents.popleft(), starts))
+                windows += len(starts)
+                if windows >= self.batch_windows:
+                    yield from self._chunk_batch(batch)
+                    batch, windows = [], 0
+            if batch:
+                yield from self._chunk_batch(batch)
+        finally:
+            if executor is not None:
+                executor.shutdown(cancel_futures=True)
+
+    def run(
+        self,
+        source: Union[str, Iterable[Union[str, Document]]],
+        output_path: str,
+        rows_per_group: int = 10_000,
+    ) -> int:
+        """Write the chunks of a corpus to JSONL or Parquet
+
+        The format follows the extension of `output_path` (.parquet or
+        .jsonl). Returns the number of chunks written.
+        """
+        start = time.perf_counter()
+        chunks = self.iter_chunks(source)
+        if output_path.endswith('.parquet'):
+            count = write_parquet(chunks, output_path, rows_per_group)
+        elif output_path.endswith(('.jsonl', '.json')):
+            count = write_jsonl(chunks, output_path)
+        else:
+            raise ValueError(
+                f'Unsupported output format: {output_path}. '
+                'Use .jsonl or .parquet',
+            )
+        logger.info(
+            'Wrote %d chunks to %s in %.1fs',
+            count, output_path, time.perf_counter() - start,
+        )
+        return count
+
+
+def write_jsonl(chunks: Iterable[ChunkRecord], output_path: str) -> int:
+    count = 0
+    with open(output_path, 'w', encoding='utf-8') as f:
+        for chunk in chunks:
+            f.write(json.dumps(asdict(chunk), ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def write_parquet(
+    chunks: Iterable[ChunkRecord],
+    output_path: str,
+    rows_per_group: int = 10_000,
+) -> int:
+    count = 0
+    rows: List[ChunkRecord] = []
+    with pq.ParquetWriter(output_path, CHUNK_SCHEMA) as writer:
+        for chunk in chunks:
+            rows.append(chunk)
+            if len(rows) == rows_per_group:
+                writer.write_table(_to_table(rows))
+                count += len(rows)
+                rows = []
+        if rows:
+            writer.write_table(_to_table(rows))
+            count += len(rows)
+    return count
+
+
+def _to_table(rows: List[ChunkRecord]) -> pa.Table:
+    return pa.Table.from_pydict(
+        {
+            name: [getattr(row, name) for row in rows]
+            for name in CHUNK_SCHEMA.names
+        },
+        schema=CHUNK_SCHEMA,
+    )
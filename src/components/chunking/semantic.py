@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Any
+from typing import Callable
+from typing import Iterable
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import numpy as np
+from src.components.chunking.embeddings import EmbeddingBackend
+
+Span = Tuple[int, int]
+
+
+@lru_cache(maxsize=None)
+def _punkt() -> Any:
+    from nltk.tokenize import PunktSentenceTokenizer
+
+    return PunktSentenceTokenizer()
+
+
+def punkt_spans(text: str) -> Iterable[Span]:
+    """Sentence spans from NLTK's untrained Punkt tokenizer
+
+    This is the tokenizer behind llama_index's default sentence splitter.
+    """
+    return _punkt().span_tokenize(text)
+
+
+def sentence_starts(
+    text: str,
+    span_tokenize: Callable[[str], Iterable[Span]] = punkt_spans,
+) -> np.ndarray:
+    """Start offset of every sentence
+
+    As in llama_index, a sentence runs up to the start of the next one, so
+    sentence i is text[starts[i]:starts[i + 1]] and the last one ends at
+    len(text).
+    """
+    return np.fromiter(
+        (start for start, _ in span_tokenize(text)), dtype=np.int64,
+    )
+
+
+def window_texts(
+    text: str, starts: np.ndarray, buffer_size: int = 1,
+) -> List[str]:
+    """Each sentence joined with `buffer_size` neighbours on both sides"""
+    n = len(starts)
+    bounds = np.append(starts, len(text))
+    first = np.maximum(np.arange(n) - buffer_size, 0)
+    last = np.minimum(np.arange(n) + buffer_size + 1, n)
+    return [
+        text[bounds[i]:bounds[j]]
+        for i, j in zip(first.tolist(), last.tolist())
+    ]
+
+
+def cosine_distances(embeddings: np.ndarray) -> np.ndarray:
+    """1 - cosine similarity of every pair of adjacent rows
+
+    Dot products go through stacked matmul, which sums in the same order as
+    the per-pair np.dot of llama_index, so tied windows stay tied.
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float64)
+    rows = embeddings[:, None, :]
+    columns = embeddings[:, :, None]
+    norms = np.sqrt((rows @ columns).ravel())
+    dots = (rows[:-1] @ columns[1:]).ravel()
+    return 1 - dots / (norms[:-1] * norms[1:])
+
+
+def chunk_spans(
+    text_length: int,
+    starts: np.ndarray,
+    embeddings: np.ndarray,
+    breakpoint_percentile_threshold: float = 95,
+) -> List[Span]:
+    """Character spans of the semantic chunks of one text
+
+    A chunk is closed after every sentence whose distance to the next
+    window is above the given percentile of all distances in the text.
+
+    Args:
+        text_length (int): Length of the text.
+        starts (np.ndarray): Sentence start offsets.
+        embeddings (np.ndarray): One sentence-window embedding per sentence.
+        breakpoint_percentile_threshold (float): Distance percentile.
+    """
+    if len(starts) == 0:
+        return []
+    if len(starts) == 1:
+        return [(int(starts[0]), text_length)]
+    distances = cosine_distances(embeddings)
+    threshold = np.percentile(distances, breakpoint_percentile_threshold)
+    breaks = starts[np.flatnonzero(distances > threshold) + 1]
+    bounds = np.concatenate(([starts[0]], breaks, [text_length])).tolist()
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class NativeSemanticSplitter:
+    """Semantic chunking without llama_index nodes
+
+    Produces the same chunks as `SemanticSplitterNodeParser` with the same
+    buffer size, threshold and embedding model, but computes distances and
+    breakpoints for a whole text in one NumPy pass and returns character
+    spans into the original text. Texts without any sentence give no chunk.
+    """
+
+    def __init__(
+        self,
+        backend: EmbeddingBackend,
+        buffer_size: int = 1,
+        breakpoint_percentile_threshold: float = 95,
+        span_tokenize: Callable[[str], Iterable[Span]] = punkt_spans,
+    ):
+        self.backend = backend
+        self.buffer_size = buffer_size
+        self.breakpoint_percentile_threshold = breakpoint_percentile_threshold
+        self.span_tokenize = span_tokenize
+
+    def spans_many(
+        self,
+        texts: Sequence[str],
+        starts: Optional[Sequence[np.ndarray]] = None,
+    ) -> List[List[Span]]:
+        """Chunk spans of many texts, embedding all their windows at once
+
+        Args:
+            texts (Sequence[str]): Texts to chunk.
+            starts (Sequence[np.ndarray], optional): Precomputed sentence
+                starts of each text, e.g. from worker processes.
+        """
+        if starts is None:
+            starts = [sentence_starts(t, self.span_tokenize) for t in texts]
+        windows = [
+            window_texts(text, text_starts, self.buffer_size)
+            for text, text_starts in zip(texts, starts)
+        ]
+        flat = [window for text_windows in windows for window in text_windows]
+        embeddings = self.backend.embed(flat) if flat else None
+        spans = []
+        offset = 0
+        for text, text_starts in zip(texts, starts):
+            n = len(text_starts)
+            spans.append(
+                chunk_spans(
+                    len(text),
+                    text_starts,
+                    embeddings[offset:offset + n] if n else None,
+                    self.breakpoint_percentile_threshold,
+                ),
+            )
+            offset += n
+        return spans
+
+    def spans(self, text: str) -> List[Span]:
+        return self.spans_many([text])[0]
+
+    def split_many(self, texts: Sequence[str]) -> List[List[str]]:
+        return [
+            [text[start:end] for start, end in text_spans]
+            for text, text_spans in zip(texts, self.spans_many(texts))
+        ]
+
+    def split(self, text: str) -> List[str]:
+        return self.split_many([text])[0]
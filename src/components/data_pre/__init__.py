@@ -1,5 +1,13 @@
 from __future__ import annotations
 
-from .sft_judge import SFTJudge
-
 __all__ = ['SFTJudge']
+
+
+def __getattr__(name: str):
+    # SFTJudge pulls in datasets and transformers; lighter modules such as
+    # faq_excel must be importable without them.
+    if name == 'SFTJudge':
+        from .sft_judge import SFTJudge
+
+        return SFTJudge
+    raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
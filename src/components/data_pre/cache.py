@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+
+from datasets import Dataset
+from datasets import load_from_disk
+from src.utils.hashing import file_sha256
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser('~'), '.cache', 'rasun', 'datasets',
+)
+META_FILE = 'cache_meta.json'
+
+
+def dir_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            total += os.path.getsize(os.path.join(root, name))
+    return total
+
+
+@dataclass
+class CacheEntry:
+    """A processed dataset stored in the cache"""
+
+    key: str
+    path: str
+    size: int
+    last_access: float
+    meta: Dict[str, Any]
+
+
+class DatasetCache:
+    """Content-addressed on-disk cache of processed datasets
+
+    Entries are keyed by the source file hash plus every parameter that
+    changes the processed output. They are stored with ``save_to_disk`` and
+    memory-mapped back with ``load_from_disk``. When the total size exceeds
+    ``max_size_gb`` the least recently used entries are evicted.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_size_gb: Optional[float] = 20.0,
+    ):
+        self.cache_dir = cache_dir
+        self.max_size_gb = max_size_gb
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(self, file_path: str, **params: Any) -> str:
+        """Build the cache key for a source file and processing parameters"""
+        payload = json.dumps(
+            {'file_sha256': file_sha256(file_path), **params},
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, key: str) -> Optional[Dataset]:
+        """Memory-map a cached dataset, or return None on a miss"""
+        path = self._entry_path(key)
+        meta_path = os.path.join(path, META_FILE)
+        if not os.path.exists(meta_path):
+            return None
+        os.utime(meta_path)
+        logger.info('Dataset cache hit %s', key)
+        return load_from_disk(path)
+
+    def store(
+        self,
+        key: str,
+        dataset: Dataset,
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> Dataset:
+        """Save a dataset under `key` and return the memory-mapped copy"""
+        path = self._entry_path(key)
+        tmp_path = os.path.join(self.cache_dir, f'.tmp-{uuid.uuid4().hex}')
+        dataset.save_to_disk(tmp_path)
+        with open(os.path.join(tmp_path, META_FILE), 'w') as f:
+            json.dump(
+                {'created': time.time(), 'num_rows': len(dataset), **(meta or {})},
+                f,
+                default=str,
+            )
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            # Another process stored the same key first.
+            shutil.rmtree(tmp_path, ignore_errors=True)
+        logger.info('Stored dataset cache entry %s', key)
+        if self.max_size_gb is not None:
+            self.prune(max_size_gb=self.max_size_gb, keep=[key])
+        return load_from_disk(path)
+
+    def entries(self) -> List[CacheEntry]:
+        """List cache entries, most recently used first"""
+        entries = []
+        for key in os.listdir(self.cache_dir):
+            path = self._entry_path(key)
+            meta_path = os.path.join(path, META_FILE)
+            if key.startswith('.') or not os.path.exists(meta_path):
+                continue
+            with open(meta_path) as f:
+                meta = json.load(f)
+            entries.append(
+                CacheEntry(
+                    key=key,
+                    path=path,
+                    size=dir_size(path),
+                    last_access=os.path.getmtime(meta_path),
+                    meta=meta,
+                ),
+            )
+        return sorted(entries, key=lambda e: e.last_access, reverse=True)
+
+    def remove(self, key: str) -> None:
+        shutil.rmtree(self._entry_path(key), ignore_errors=True)
+
+    def prune(
+        self,
+        max_size_gb: Optional[float] = None,
+        older_than_days: Optional[float] = None,
+        keep: Optional[List[str]] = None,
+    ) -> List[CacheEntry]:
+        """Evict least recently used entries
+
+        Args:
+            max_size_gb (float, optional): Evict until the cache is at most this size.
+            older_than_days (float, optional): Evict entries not used for this long.
+            keep (List[str], optional): Keys that must not be evicted.
+
+        Returns:
+            List[CacheEntry]: The evicted entries.
+        """
+        keep = keep or []
+        entries = self.entries()
+        total = sum(entry.size for entry in entries)
+        now = time.time()
+        removed = []
+        for entry in reversed(entries):
+            if entry.key in keep:
+                continue
+            too_old = (
+                older_than_days is not None
+                and now - entry.last_access > older_than_days * 86400
+            )
+            too_big = (
+                max_size_gb is not None and total > max_size_gb * 1024**3
+            )
+            if not (too_old or too_big):
+                continue
+            self.remove(entry.key)
+            total -= entry.size
+            removed.append(entry)
+            logger.info('Evicted dataset cache entry %s', entry.key)
+        return removed
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import logging
+import re
+from typing import Any
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+logger = logging.getLogger(__name__)
+
+# How far down a sheet the header row is looked for.
+MAX_HEADER_ROW = 20
+FAQ_FIELDS = ['no', 'category', 'question', 'answer_vn', 'answer_en', 'pic']
+FAQ_SCHEMA = pa.schema(
+    [
+        ('source_file', pa.string()),
+        ('sheet', pa.string()),
+        ('row', pa.int32()),
+        *[(name, pa.string()) for name in FAQ_FIELDS],
+    ],
+)
+
+_SPACES = re.compile(r'[ \t\u00a0]+')
+# Text matching none of these only needs strip().
+_NEEDS_CLEANUP = re.compile(r'[\t\r\u00a0]|  | \n|\n ')
+
+
+def normalize_cell(value: Any) -> Optional[str]:
+    """Cell value as stripped text, None when empty
+
+    Runs of spaces are collapsed and line endings unified; line breaks are
+    kept, since questions and answers often hold a Vietnamese and an
+    English version on separate lines.
+    """
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = str(value)
+    if _NEEDS_CLEANUP.search(text):
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        text = '\n'.join(_SPACES.sub(' ', line).strip() for line in lines)
+    return text.strip() or None
+
+
+def header_field(title: Any) -> Optional[str]:
+    """FAQ field of a header cell such as 'Answer (VN)', None if unknown"""
+    title = (normalize_cell(title) or '').lower()
+    if not title:
+        return None
+    if title in ('no', 'no.', 'stt', '#'):
+        return 'no'
+    if title.startswith('categor'):
+        return 'category'
+    if title.startswith('question'):
+        return 'question'
+    # The source workbooks spell it both 'Answers' and 'Anwers'.
+    if title.startswith(('answer', 'anwer')):
+        return 'answer_en' if re.search(r'\ben\b', title) else 'answer_vn'
+    if 'pic' in title.split():
+        return 'pic'
+    return None
+
+
+def find_header(
+    rows: Iterator[Sequence[Any]],
+) -> Optional[Tuple[int, Dict[int, str]]]:
+    """Consume rows up to the header row
+
+    The header is the first row with a 'Question' column.
+
+    Returns:
+        Tuple[int, Dict[int, str]]: Rows consumed, the header included, and
+            the FAQ field of each column index; None if no header appears
+            within MAX_HEADER_ROW rows.
+    """
+    for consumed, row in zip(range(1, MAX_HEADER_ROW + 1), rows):
+        columns = {}
+        for index, title in enumerate(row):
+            field = header_field(title)
+            if field is not None and field not in columns.values():
+                columns[index] = field
+        if 'question' in columns.values():
+            return consumed, columns
+    return None
+
+
+def iter_faq_records(
+    file_path: str,
+    sheets: Optional[List[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """Stream normalized FAQ rows from every sheet of a workbook
+
+    The workbook is opened read-only and rows are read as plain values, so
+    memory stays flat whatever the workbook size. Empty rows and rows with
+    neither a question nor an answer are skipped. Categories are
+    forward-filled, since merged category cells only hold a value in their
+    first row.
+
+    Args:
+        file_path (str): Path to the .xlsx workbook.
+        sheets (List[str], optional): Sheets to read, all if None.
+    """
+    workbook = load_workbook(
+        file_path, read_only=True, data_only=True, keep_links=False,
+    )
+    try:
+        for sheet in workbook.worksheets:
+            if sheets is not None and sheet.title not in sheets:
+                continue
+            rows = sheet.iter_rows(min_row=1, values_only=True)
+            header = find_header(rows)
+            if header is None:
+                logger.warning(
+                    'No FAQ header in sheet %r of %s', sheet.title, file_path,
+                )
+                continue
+            row_number, columns = header
+            category = None
+            for row in rows:
+                row_number += 1
+                record = dict.fromkeys(FAQ_FIELDS)
+                for index, field in columns.items():
+                    if index < len(row):
+                        record[field] = normalize_cell(row[index])
+                if record['category'] is None:
+                    record['category'] = category
+                category = record['category']
+                if not (
+                    record['question']
+                    or record['answer_vn']
+                    or record['answer_en']
+                ):
+                    continue
+                yield {
+                    'source_file': file_path,
+                    'sheet': sheet.title,
+                    'row': row_number,
+                    **record,
+                }
+    finally:
+        workbook.close()
+
+
+def _to_table(records: List[Dict[str, Any]]) -> pa.Table:
+    return pa.Table.from_pydict(
+        {
+            name: [record[name] for record in records]
+            for name in FAQ_SCHEMA.names
+        },
+        schema=FAQ_SCHEMA,
+    )
+
+
+def excel_to_parquet(
+    file_paths: Union[str, Iterable[str]],
+    output_path: str,
+    sheets: Optional[List[str]] = None,
+    batch_size: int = 5000,
+) -> int:
+    """Write the FAQ rows of one or more workbooks to a Parquet file
+
+    Rows are streamed from the workbooks and written in row groups of
+    `batch_size`, with the source file, sheet and row of each record.
+
+    Args:
+        file_paths (Union[str, Iterable[str]]): Workbook path(s).
+        output_path (str): Parquet file to write.
+        sheets (List[str], optional): Sheets to read, all if None.
+        batch_size (int): Rows per Parquet row group.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if isinstance(file_paths, str):
+        file_paths = [file_paths]
+    num_rows = 0
+    batch: List[Dict[str, Any]] = []
+    with pq.ParquetWriter(output_path, FAQ_SCHEMA) as writer:
+        for file_path in file_paths:
+            for record in iter_faq_records(file_path, sheets):
+                batch.append(record)
+                if len(batch) == batch_size:
+                    writer.write_table(_to_table(batch))
+                    num_rows += len(batch)
+                    batch = []
+        if batch:
+            writer.write_table(_to_table(batch))
+            num_rows += len(batch)
+    logger.info('Wrote %d FAQ rows to %s', num_rows, output_path)
+    return num_rows
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+from string import Formatter
+from typing import List
+from typing import Tuple
+from typing import Union
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Bump whenever the formatted text changes for the same inputs.
+FORMATTER_VERSION = '1'
+
+
+def split_template(template: str) -> Tuple[List[str], List[str]]:
+    """Split a format template into static segments and field names
+
+    The template is rebuilt as
+    ``segments[0] + {fields[0]} + segments[1] + ... + segments[-1]``.
+
+    Args:
+        template (str): Template using plain ``{name}`` placeholders.
+
+    Returns:
+        Tuple[List[str], List[str]]: Static segments and the field names between them.
+    """
+    segments: List[str] = []
+    fields: List[str] = []
+    literal = ''
+    for text, field, spec, conversion in Formatter().parse(template):
+        literal += text
+        if field is None:
+            continue
+        if not field or spec or conversion:
+            raise ValueError(
+                f'Only named placeholders are supported, got {{{field}}}',
+            )
+        segments.append(literal)
+        fields.append(field)
+        literal = ''
+    segments.append(literal)
+    return segments, fields
+
+
+def as_text(column: Union[pa.Array, pa.ChunkedArray]) -> pa.ChunkedArray:
+    """Render a column the way ``str.format`` renders its python values"""
+    if pa.types.is_string(column.type) or pa.types.is_large_string(
+        column.type,
+    ):
+        return pc.fill_null(column.cast(pa.large_string()), 'None')
+    return pa.chunked_array(
+        [
+            pa.array(
+                [str(value) for value in column.to_pylist()],
+                pa.large_string(),
+            ),
+        ],
+    )
+
+
+class PromptFormatter:
+    """Vectorized prompt formatter over Arrow batches
+
+    The template is split once into static segments; every batch is then
+    formatted by joining whole columns with Arrow compute instead of calling
+    ``str.format`` per row.
+    """
+
+    def __init__(self, template: str, suffix: str = ''):
+        self.template = template
+        self.suffix = suffix
+        self.segments, self.fields = split_template(template)
+
+    def format(self, batch: pa.Table) -> pa.ChunkedArray:
+        parts: list = []
+        for literal, field in zip(self.segments, self.fields):
+            if literal:
+                parts.append(pa.scalar(literal, pa.large_string()))
+            parts.append(as_text(batch.column(field)))
+        tail = self.segments[-1] + self.suffix
+        if not self.fields:
+            return pa.chunked_array(
+                [pa.array([tail] * batch.num_rows, pa.large_string())],
+            )
+        if tail:
+            parts.append(pa.scalar(tail, pa.large_string()))
+        return pc.binary_join_element_wise(
+            *parts, pa.scalar('', pa.large_string()),
+        )
+
+    def __call__(self, batch: pa.Table) -> pa.Table:
+        return pa.table({'text': self.format(batch)})
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any
+from typing import Callable
+from typing import List
+from typing import Optional
+
+from datasets import Dataset
+
+logger = logging.getLogger(__name__)
+
+# Below this many rows per worker, process start-up costs more than it saves.
+MIN_ROWS_PER_PROC = 20_000
+# Target in-memory size of one map batch.
+TARGET_BATCH_BYTES = 32 * 1024 * 1024
+MIN_BATCH_SIZE = 100
+MAX_BATCH_SIZE = 50_000
+
+
+@dataclass
+class ParallelConfig:
+    """Worker count and batch size for dataset.map"""
+
+    num_proc: int
+    batch_size: int
+
+
+@dataclass
+class WorkerThroughput:
+    """Rows processed by one map worker"""
+
+    rank: int
+    rows: int
+    seconds: float
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+
+def cpu_count() -> int:
+    """Number of CPUs this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def num_rows(batch: Any) -> int:
+    """Number of rows in a batch given as a dict of columns or an Arrow table"""
+    if isinstance(batch, dict):
+        return len(next(iter(batch.values()), []))
+    return batch.num_rows
+
+
+def auto_tune(
+    dataset: Dataset,
+    num_proc: Optional[int] = None,
+    batch_size: Optional[int] = None,
+) -> ParallelConfig:
+    """Pick a worker count and batch size for a dataset
+
+    Args:
+        dataset (Dataset): Dataset that will be mapped.
+        num_proc (int, optional): Worker count. Derived from the CPU count and
+            row count if None.
+        batch_size (int, optional): Rows per batch. Derived from the average
+            row size if None.
+
+    Returns:
+        ParallelConfig: The chosen configuration.
+    """
+    rows = max(1, len(dataset))
+    if num_proc is None:
+        num_proc = max(1, min(cpu_count(), rows // MIN_ROWS_PER_PROC))
+    if batch_size is None:
+        row_bytes = max(1, dataset.data.nbytes // rows)
+        batch_size = TARGET_BATCH_BYTES // row_bytes
+        # Keep at least one batch per worker.
+        batch_size = min(batch_size, -(-rows // num_proc))
+        batch_size = max(MIN_BATCH_SIZE, min(MAX_BATCH_SIZE, batch_size))
+    return ParallelConfig(num_proc=num_proc, batch_size=batch_size)
+
+
+class ThroughputRecorder:
+    """Wrap a batched map function and record rows/s for each worker rank
+
+    Each worker writes its running totals to ``<stats_dir>/<rank>.json`` so
+    the parent process can read them after ``dataset.map`` returns.
+    """
+
+    def __init__(self, function: Callable, stats_dir: str):
+        self.function = function
+        self.stats_dir = stats_dir
+        self.rows = 0
+        self.seconds = 0.0
+
+    def __call__(self, batch: Any, rank: Optional[int] = None, **kwargs):
+        start = time.perf_counter()
+        output = self.function(batch, **kwargs)
+        self.seconds += time.perf_counter() - start
+        self.rows += num_rows(output)
+        with open(os.path.join(self.stats_dir, f'{rank or 0}.json'), 'w') as f:
+            json.dump({'rows': self.rows, 'seconds': self.seconds}, f)
+        return output
+
+    def collect(self) -> List[WorkerThroughput]:
+        stats = []
+        for name in sorted(os.listdir(self.stats_dir)):
+            rank = int(os.path.splitext(name)[0])
+            with open(os.path.join(self.stats_dir, name)) as f:
+                data = json.load(f)
+            stats.append(WorkerThroughput(rank=rank, **data))
+        return sorted(stats, key=lambda s: s.rank)
+
+
+def log_throughput(stats: List[WorkerThroughput], wall_seconds: float) -> None:
+    for worker in stats:
+        logger.info(
+            'worker %d: %d rows in %.2fs (%.0f rows/s)',
+            worker.rank,
+            worker.rows,
+            worker.seconds,
+            worker.rows_per_second,
+        )
+    total = sum(worker.rows for worker in stats)
+    logger.info(
+        'processed %d rows with %d workers in %.2fs (%.0f rows/s)',
+        total,
+        len(stats),
+        wall_seconds,
+        total / wall_seconds if wall_seconds else 0.0,
+    )
@@ -1,14 +1,37 @@
 from __future__ import annotations
 
+import atexit
+import os
+import shutil
+import tempfile
+import time
+from typing import Callable
+from typing import List
 from typing import Optional
 
 import pandas as pd
 from datasets import Dataset
 from src.base.base_data import BaseDataModule
+from src.components.data_pre.cache import DatasetCache
+from src.components.data_pre.formatting import FORMATTER_VERSION
+from src.components.data_pre.formatting import PromptFormatter
+from src.components.data_pre.parallel import auto_tune
+from src.components.data_pre.parallel import log_throughput
+from src.components.data_pre.parallel import ParallelConfig
+from src.components.data_pre.parallel import ThroughputRecorder
+from src.components.data_pre.parallel import WorkerThroughput
+from src.components.data_pre.streaming import csv_to_arrow
 from src.components.prompts.judge import PROMPT_WITH_CONTEXT
 from src.components.prompts.judge import PROMPT_WITHOUT_CONTEXT
 from transformers import AutoTokenizer
 
+COLUMN_MAPPING = {
+    'query': 'instruction',
+    'chunk': 'input',
+    'response': 'output',
+    'check_response': 'label',
+}
+
 
 class SFTJudge(BaseDataModule):
     def __init__(
@@ -18,31 +41,232 @@ class SFTJudge(BaseDataModule):
     ):
         self.prompt_without_context = prompt_without_context
         self.prompt_with_context = prompt_with_context
+        self.throughput: List[WorkerThroughput] = []
 
     def process(
         self,
         file_path: Optional[str] = None,
         mode: str = 'with_context',
         tokenizer: Optional[AutoTokenizer] = None,
+        streaming: bool = False,
+        max_memory_mb: int = 512,
+        vectorized: bool = True,
+        cache_dir: Optional[str] = None,
+        num_proc: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        tokenize: bool = False,
+        max_seq_length: int = 2048,
     ):
         if not file_path:
             raise ValueError('file_path is required for processing')
-        dataset = self.get_data(file_path)
-        dataset = dataset.map(
-            self.formatting_prompts_func,
-            batched=True,
-            fn_kwargs={'mode': mode, 'tokenizer': tokenizer},
+        cache = DatasetCache(cache_dir) if cache_dir else None
+        if cache is not None:
+            if tokenizer is None:
+                raise ValueError('tokenizer is required to use the cache')
+            key = cache.key(
+                file_path,
+                mode=mode,
+                template=self.template_for(mode),
+                eos_token=tokenizer.eos_token,
+                formatter_version=FORMATTER_VERSION,
+                # Streaming reads every column as str, pandas infers dtypes.
+                streaming=streaming,
+                **self._tokenize_key(tokenizer, tokenize, max_seq_length),
+            )
+            dataset = cache.load(key)
+            if dataset is not None:
+                return dataset
+
+        scratch_dir = None
+        if streaming and cache is not None:
+            # Dot-prefixed, so cache entries() and prune() ignore it.
+            scratch_dir = tempfile.mkdtemp(
+                prefix='.stream-', dir=cache.cache_dir,
+            )
+        try:
+            dataset = self.get_data(
+                file_path,
+                streaming=streaming,
+                max_memory_mb=max_memory_mb,
+                arrow_path=os.path.join(scratch_dir, 'data.arrow')
+                if scratch_dir else None,
+            )
+            dataset = self.format_dataset(
+                dataset,
+                mode=mode,
+                tokenizer=tokenizer,
+                vectorized=vectorized,
+                num_proc=num_proc,
+                batch_size=batch_size,
+            )
+            if tokenize:
+                dataset = self.tokenize_dataset(
+                    dataset,
+                    tokenizer=tokenizer,
+                    max_seq_length=max_seq_length,
+                    num_proc=num_proc,
+                    batch_size=batch_size,
+                )
+
+            if cache is not None:
+                dataset = cache.store(
+                    key, dataset, meta={'source': file_path, 'mode': mode},
+                )
+        finally:
+            if scratch_dir is not None:
+                # The stored copy is memory-mapped from the cache entry.
+                shutil.rmtree(scratch_dir, ignore_errors=True)
+        return dataset
+
+    @staticmethod
+    def _tokenize_key(
+        tokenizer: AutoTokenizer, tokenize: bool, max_seq_length: int,
+    ) -> dict:
+        if not tokenize:
+            return {}
+        return {
+            'tokenizer': getattr(tokenizer, 'name_or_path', ''),
+            'vocab_size': len(tokenizer),
+            'max_seq_length': max_seq_length,
+        }
+
+    def format_dataset(
+        self,
+        dataset: Dataset,
+        mode: str = 'with_context',
+        tokenizer: Optional[AutoTokenizer] = None,
+        vectorized: bool = True,
+        num_proc: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dataset:
+        """Replace the raw columns with the formatted 'text' column
+
+        Workers get contiguous shards that are concatenated back in order, so
+        the output order does not depend on the worker count. Per-worker
+        throughput is logged and kept in `self.throughput`.
+
+        Args:
+            dataset (Dataset): Dataset returned by get_data().
+            mode (str): 'with_context' uses the chunk in the prompt, anything else does not.
+            tokenizer (AutoTokenizer): Tokenizer whose eos token ends every prompt.
+            vectorized (bool): Use the Arrow formatter instead of formatting_prompts_func.
+            num_proc (int, optional): Worker processes. Auto-tuned if None.
+            batch_size (int, optional): Rows per map batch. Auto-tuned if None.
+
+        Returns:
+            Dataset: Dataset with a single 'text' column.
+        """
+        config = auto_tune(dataset, num_proc=num_proc, batch_size=batch_size)
+        if vectorized:
+            function = self.prompt_formatter(mode=mode, tokenizer=tokenizer)
+            fn_kwargs = {}
+            dataset = dataset.with_format('arrow')
+        else:
+            function = self.formatting_prompts_func
+            fn_kwargs = {'mode': mode, 'tokenizer': tokenizer}
+
+        dataset = self._map(
+            dataset,
+            function,
+            config,
+            fn_kwargs=fn_kwargs,
+            remove_columns=dataset.column_names,
         )
-        dataset = dataset.remove_columns(
-            [col for col in dataset.column_names if col != 'text'],
+        return dataset.with_format(None)
+
+    def tokenize_dataset(
+        self,
+        dataset: Dataset,
+        tokenizer: AutoTokenizer,
+        max_seq_length: int = 2048,
+        num_proc: Optional[int] = None,
+        batch_size: Optional[int] = None,
+    ) -> Dataset:
+        """Add 'input_ids', 'attention_mask' and 'length' columns
+
+        Tokenizes the 'text' column the same way SFTTrainer does, so the
+        trainer can skip its own tokenization pass.
+
+        Args:
+            dataset (Dataset): Dataset with a 'text' column.
+            tokenizer (AutoTokenizer): Fast tokenizer of the model being trained.
+            max_seq_length (int): Sequences are truncated to this many tokens.
+            num_proc (int, optional): Worker processes. Auto-tuned if None.
+            batch_size (int, optional): Rows per map batch. Auto-tuned if None.
+
+        Returns:
+            Dataset: The dataset with the tokenized columns added.
+        """
+        config = auto_tune(dataset, num_proc=num_proc, batch_size=batch_size)
+        return self._map(
+            dataset,
+            self.tokenize_function,
+            config,
+            fn_kwargs={
+                'tokenizer': tokenizer,
+                'max_seq_length': max_seq_length,
+            },
+        )
+
+    def tokenize_function(
+        self,
+        examples: dict,
+        tokenizer: AutoTokenizer,
+        max_seq_length: int = 2048,
+    ) -> dict:
+        encoded = tokenizer(
+            examples['text'],
+            add_special_tokens=True,
+            truncation=True,
+            padding=False,
+            max_length=max_seq_length,
         )
+        return {
+            'input_ids': encoded['input_ids'],
+            'attention_mask': encoded['attention_mask'],
+            'length': [len(ids) for ids in encoded['input_ids']],
+        }
+
+    def _map(
+        self,
+        dataset: Dataset,
+        function: Callable,
+        config: ParallelConfig,
+        fn_kwargs: Optional[dict] = None,
+        remove_columns: Optional[List[str]] = None,
+    ) -> Dataset:
+        with tempfile.TemporaryDirectory(prefix='sft_judge_stats_') as stats_dir:
+            recorder = ThroughputRecorder(function, stats_dir)
+            start = time.perf_counter()
+            dataset = dataset.map(
+                recorder,
+                batched=True,
+                batch_size=config.batch_size,
+                num_proc=config.num_proc if config.num_proc > 1 else None,
+                with_rank=True,
+                fn_kwargs=fn_kwargs,
+                remove_columns=remove_columns,
+            )
+            self.throughput = recorder.collect()
+            log_throughput(self.throughput, time.perf_counter() - start)
         return dataset
 
-    def get_data(self, file_path: Optional[str] = None) -> Dataset:
+    def get_data(
+        self,
+        file_path: Optional[str] = None,
+        streaming: bool = False,
+        max_memory_mb: int = 512,
+        arrow_path: Optional[str] = None,
+    ) -> Dataset:
         """Get data from raw csv file
 
         Args:
             file_path (str, optional): Path to the data file. If None, uses the instance's file_path.
+            streaming (bool): Read the csv in bounded chunks into a memory-mapped
+                Arrow file instead of loading the whole frame.
+            max_memory_mb (int): Memory budget for one chunk when streaming.
+            arrow_path (str, optional): Where to write the Arrow file when streaming.
+                Defaults to a new temporary directory, removed at exit.
 
         Returns:
             Dataset: The processed dataset
@@ -53,21 +277,54 @@ class SFTJudge(BaseDataModule):
                 'No file path provided. Either pass file_path to get_data() or set it in __init__',
             )
 
+        if streaming:
+            if arrow_path is None:
+                tmp_dir = tempfile.mkdtemp(prefix='sft_judge_')
+                # The dataset maps the file, so it can only go at exit.
+                atexit.register(shutil.rmtree, tmp_dir, ignore_errors=True)
+                arrow_path = os.path.join(tmp_dir, 'data.arrow')
+            csv_to_arrow(
+                input_path,
+                arrow_path,
+                columns=COLUMN_MAPPING,
+                max_memory_mb=max_memory_mb,
+            )
+            return Dataset.from_file(arrow_path)
+
         df = pd.read_csv(input_path)
 
-        df = df.rename(
-            columns={
-                'query': 'instruction',
-                'chunk': 'input',
-                'response': 'output',
-                'check_response': 'label',
-            },
-        )
+        df = df.rename(columns=COLUMN_MAPPING)
 
         dataset = Dataset.from_pandas(df)
 
         return dataset
 
+    def prompt_formatter(
+        self,
+        mode: str = 'with_context',
+        tokenizer: Optional[AutoTokenizer] = None,
+    ) -> PromptFormatter:
+        """Build the vectorized formatter equivalent to formatting_prompts_func
+
+        Args:
+            mode (str): 'with_context' uses the chunk in the prompt, anything else does not.
+            tokenizer (AutoTokenizer): Tokenizer whose eos token ends every prompt.
+
+        Returns:
+            PromptFormatter: Callable mapping an Arrow batch to a 'text' column.
+        """
+        if tokenizer is None:
+            raise ValueError('tokenizer is required to append the eos token')
+        return PromptFormatter(
+            self.template_for(mode), suffix=tokenizer.eos_token,
+        )
+
+    def template_for(self, mode: str = 'with_context') -> str:
+        """Return the prompt template used for a mode"""
+        if mode == 'with_context':
+            return self.prompt_with_context
+        return self.prompt_without_context
+
     def formatting_prompts_func(
         self,
         examples: dict,
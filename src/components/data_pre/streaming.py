@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import logging
+import resource
+from typing import Dict
+from typing import Iterator
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+
+logger = logging.getLogger(__name__)
+
+# Pandas frame plus the Arrow table converted from it are alive together.
+CHUNK_OVERHEAD = 2
+
+
+def max_rss_mb() -> float:
+    """Peak resident set size of the current process in MB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def estimate_chunksize(
+    file_path: str,
+    max_memory_mb: int,
+    sample_rows: int = 1000,
+) -> int:
+    """Estimate how many csv rows fit in the memory budget
+
+    Args:
+        file_path (str): Path to the csv file.
+        max_memory_mb (int): Memory budget for one chunk in MB.
+        sample_rows (int): Number of rows used to measure the row footprint.
+
+    Returns:
+        int: Number of rows to read per chunk.
+    """
+    sample = pd.read_csv(file_path, nrows=sample_rows, dtype=str)
+    if sample.empty:
+        return sample_rows
+    bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+    budget = max_memory_mb * 1024 * 1024
+    return max(1, int(budget / (bytes_per_row * CHUNK_OVERHEAD)))
+
+
+def iter_csv_chunks(
+    file_path: str,
+    chunksize: int,
+    columns: Optional[Dict[str, str]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Read a csv file in chunks of at most `chunksize` rows
+
+    All columns are read as strings so every chunk has the same schema.
+    """
+    with pd.read_csv(file_path, chunksize=chunksize, dtype=str) as reader:
+        for chunk in reader:
+            if columns:
+                chunk = chunk.rename(columns=columns)
+            yield chunk
+
+
+def csv_to_arrow(
+    file_path: str,
+    output_path: str,
+    columns: Optional[Dict[str, str]] = None,
+    max_memory_mb: int = 512,
+    chunksize: Optional[int] = None,
+) -> int:
+    """Convert a csv file to an Arrow stream file chunk by chunk
+
+    Args:
+        file_path (str): Path to the csv file.
+        output_path (str): Path of the Arrow file to write.
+        columns (dict, optional): Column rename mapping applied to every chunk.
+        max_memory_mb (int): Memory budget for one chunk in MB.
+        chunksize (int, optional): Rows per chunk. Estimated from the budget if None.
+
+    Returns:
+        int: Number of rows written.
+    """
+    if chunksize is None:
+        chunksize = estimate_chunksize(file_path, max_memory_mb)
+    logger.info(
+        'Streaming %s to %s: budget=%dMB chunksize=%d rows',
+        file_path,
+        output_path,
+        max_memory_mb,
+        chunksize,
+    )
+
+    num_rows = 0
+    peak_chunk_mb = 0.0
+    writer = None
+    schema = None
+    try:
+        for chunk in iter_csv_chunks(file_path, chunksize, columns):
+            chunk_mb = chunk.memory_usage(deep=True).sum() / (1024 * 1024)
+            if schema is None:
+                # Fixed up front: a column empty in a whole chunk would
+                # otherwise be inferred as null and break the stream.
+                schema = pa.schema(
+                    [(str(name), pa.string()) for name in chunk.columns],
+                )
+            table = pa.Table.from_pandas(
+                chunk, schema=schema, preserve_index=False,
+            )
+            peak_chunk_mb = max(
+                peak_chunk_mb, chunk_mb + table.nbytes / (1024 * 1024),
+            )
+            if writer is None:
+                writer = pa.ipc.new_stream(output_path, table.schema)
+            writer.write_table(table)
+            num_rows += len(chunk)
+            del chunk, table
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        raise ValueError(f'No rows found in {file_path}')
+
+    logger.info(
+        'Wrote %d rows to %s: peak chunk=%.1fMB peak rss=%.1fMB',
+        num_rows,
+        output_path,
+        peak_chunk_mb,
+        max_rss_mb(),
+    )
+    return num_rows
@@ -0,0 +1,295 @@
+from __future__ import annotations
+
+import csv
+import json
+import logging
+import os
+import queue
+import string
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any
+from typing import Dict
+from typing import IO
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from src.components.inference.infer import Inference
+from src.components.inference.infer import LABELS
+from src.components.inference.memo import VerdictCache
+from src.components.prompts.judge import PROMPT_WITH_CONTEXT
+
+logger = logging.getLogger(__name__)
+
+FIELDS = {'query': 'instruction', 'chunk': 'input', 'response': 'output'}
+
+
+@dataclass
+class RecordBatch:
+    """Rows read from the input and the input position right after them"""
+
+    rows: List[Dict[str, Any]]
+    offset: int
+
+
+def iter_lines(f: IO[str]) -> Iterator[str]:
+    # readline keeps f.tell() usable, unlike iterating the file directly.
+    while True:
+        line = f.readline()
+        if not line:
+            return
+        yield line
+
+
+def iter_batches(
+    input_path: str,
+    batch_size: int,
+    offset: int = 0,
+    header: Optional[List[str]] = None,
+) -> Iterator[RecordBatch]:
+    """Read a CSV or JSONL file in batches, starting at a saved offset
+
+    Args:
+        input_path (str): CSV file with a header row, or JSONL file.
+        batch_size (int): Rows per batch.
+        offset (int): Input position to resume from, 0 for the start.
+        header (List[str], optional): CSV header when resuming past it.
+    """
+    is_jsonl = input_path.endswith(('.jsonl', '.json'))
+    with open(input_path, newline='', encoding='utf-8-sig') as f:
+        f.seek(offset)
+        lines = iter_lines(f)
+        if is_jsonl:
+            records = (json.loads(line) for line in lines if line.strip())
+        else:
+            records = csv.DictReader(lines, fieldnames=header)
+        rows = []
+        for record in records:
+            rows.append(record)
+            if len(rows) == batch_size:
+                yield RecordBatch(rows, f.tell())
+                rows = []
+        if rows:
+            yield RecordBatch(rows, f.tell())
+
+
+def read_header(input_path: str) -> Optional[List[str]]:
+    if input_path.endswith(('.jsonl', '.json')):
+        return None
+    # utf-8-sig: a BOM would otherwise end up in the first column name.
+    with open(input_path, newline='', encoding='utf-8-sig') as f:
+        return next(csv.reader(iter_lines(f)), None)
+
+
+def required_columns(prompt_base: str) -> List[str]:
+    """Input columns whose prompt field appears in the template"""
+    names = {
+        name for _, name, _, _ in string.Formatter().parse(prompt_base)
+        if name
+    }
+    return [column for column, name in FIELDS.items() if name in names]
+
+
+def check_columns(
+    columns: Sequence[str], prompt_base: str, input_path: str,
+) -> None:
+    missing = [
+        column for column in required_columns(prompt_base)
+        if column not in columns
+    ]
+    if missing:
+        raise ValueError(
+            f'{input_path} is missing required columns {missing}; '
+            f'found {list(columns)}',
+        )
+
+
+class Prefetcher:
+    """Read batches on a background thread into a bounded queue"""
+
+    _DONE = object()
+
+    def __init__(self, batches: Iterator[RecordBatch], size: int = 4):
+        self.queue: queue.Queue = queue.Queue(maxsize=size)
+        self.batches = batches
+        self.thread = threading.Thread(
+            target=self._fill, name='judge-prefetch', daemon=True,
+        )
+        self.thread.start()
+
+    def _fill(self) -> None:
+        try:
+            for batch in self.batches:
+                self.queue.put(batch)
+        except Exception as error:
+            self.queue.put(error)
+        self.queue.put(self._DONE)
+
+    def __iter__(self) -> Iterator[RecordBatch]:
+        while True:
+            item = self.queue.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+
+class Checkpoint:
+    """Progress of a bulk judging job, saved next to its output"""
+
+    def __init__(self, output_path: str, input_path: str):
+        self.path = f'{output_path}.ckpt'
+        self.input_path = input_path
+        self.rows_done = 0
+        self.input_offset = 0
+        self.output_bytes = 0
+        self.header: Optional[List[str]] = None
+
+    def _input_stat(self) -> Dict[str, Any]:
+        stat = os.stat(self.input_path)
+        return {'size': stat.st_size, 'mtime': stat.st_mtime}
+
+    def load(self) -> bool:
+        """Load saved progress; False if there is none for this input"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path) as f:
+            state = json.load(f)
+        expected = {'path': self.input_path, **self._input_stat()}
+        if state.get('input') != expected:
+            logger.warning(
+                'Ignoring checkpoint %s made for another input', self.path,
+            )
+            return False
+        self.rows_done = state['rows_done']
+        self.input_offset = state['input_offset']
+        self.output_bytes = state['output_bytes']
+        self.header = state['header']
+        return True
+
+    def save(self) -> None:
+        tmp_path = f'{self.path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(
+                {
+                    'input': {'path': self.input_path, **self._input_stat()},
+                    'rows_done': self.rows_done,
+                    'input_offset': self.input_offset,
+                    'output_bytes': self.output_bytes,
+                    'header': self.header,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+
+
+def judge_file(
+    inference: Inference,
+    input_path: str,
+    output_path: str,
+    prompt_base: str = PROMPT_WITH_CONTEXT,
+    labels: Sequence[str] = LABELS,
+    batch_size: int = 256,
+    prefetch: int = 4,
+    max_batch_tokens: int = 32768,
+    keep_columns: Optional[List[str]] = None,
+    resume: bool = True,
+    cache: Optional[VerdictCache] = None,
+) -> int:
+    """Judge every (query, chunk, response) row of a CSV/JSONL file
+
+    Rows are read ahead on a background thread, scored batch by batch with
+    `Inference.score` and appended to `output_path` as JSONL. After every
+    batch the output is flushed and a checkpoint is saved, so a killed job
+    restarted with the same arguments continues after the last saved batch.
+
+    Args:
+        inference (Inference): Inference with the judge model loaded.
+        input_path (str): CSV or JSONL file with query, chunk and response.
+        output_path (str): JSONL file receiving one verdict per row.
+        prompt_base (str): Judge prompt template.
+        labels (Sequence[str]): Candidate labels.
+        batch_size (int): Rows scored per batch.
+        prefetch (int): Batches read ahead of the model.
+        max_batch_tokens (int): Token budget of one forward pass.
+        keep_columns (List[str], optional): Input columns copied to the output.
+        resume (bool): Continue from an existing checkpoint.
+        cache (VerdictCache, optional): Skip rows judged before.
+
+    Returns:
+        int: Total number of rows judged, including resumed ones.
+    """
+    checkpoint = Checkpoint(output_path, input_path)
+    if not (resume and checkpoint.load()):
+        checkpoint.header = read_header(input_path)
+        checkpoint.input_offset = 0
+        checkpoint.rows_done = 0
+        checkpoint.output_bytes = 0
+    elif checkpoint.rows_done:
+        logger.info(
+            'Resuming %s at row %d', input_path, checkpoint.rows_done,
+        )
+
+    if checkpoint.header is not None:
+        check_columns(checkpoint.header, prompt_base, input_path)
+    # A header row is consumed on a fresh start; a resume reuses the saved one.
+    header = checkpoint.header if checkpoint.input_offset else None
+    batches = Prefetcher(
+        iter_batches(input_path, batch_size, checkpoint.input_offset, header),
+        size=prefetch,
+    )
+    start = time.perf_counter()
+    rows_at_start = checkpoint.rows_done
+    mode = 'r+b' if os.path.exists(output_path) else 'wb'
+    with open(output_path, mode) as out:
+        out.truncate(checkpoint.output_bytes)
+        out.seek(checkpoint.output_bytes)
+        for batch in batches:
+            if checkpoint.header is None and batch.rows:
+                # JSONL has no header: check each batch's first row.
+                check_columns(list(batch.rows[0]), prompt_base, input_path)
+            fields = [
+                {
+                    name: row.get(column) or ''
+                    for column, name in FIELDS.items()
+                }
+                for row in batch.rows
+            ]
+            if cache is not None:
+                verdicts = cache.score(
+                    inference, prompt_base, fields, labels, max_batch_tokens,
+                )
+            else:
+                verdicts = inference.score(
+                    prompt_base, fields, labels, max_batch_tokens,
+                )
+            lines = []
+            for i, (row, verdict) in enumerate(zip(batch.rows, verdicts)):
+                record = {'row': checkpoint.rows_done + i}
+                for column in keep_columns or []:
+                    record[column] = row.get(column)
+                record.update(
+                    label=verdict.label,
+                    probability=verdict.probability,
+                    probabilities=verdict.probabilities,
+                )
+                lines.append(json.dumps(record, ensure_ascii=False) + '\n')
+            out.write(''.join(lines).encode('utf-8'))
+            out.flush()
+            os.fsync(out.fileno())
+
+            checkpoint.rows_done += len(batch.rows)
+            checkpoint.input_offset = batch.offset
+            checkpoint.output_bytes = out.tell()
+            checkpoint.save()
+            elapsed = time.perf_counter() - start
+            logger.info(
+                'Judged %d rows (%.1f rows/s)',
+                checkpoint.rows_done,
+                (checkpoint.rows_done - rows_at_start) / elapsed,
+            )
+    return checkpoint.rows_done
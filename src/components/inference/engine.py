@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import Counter
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Deque
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from src.components.inference.infer import Inference
+from src.components.inference.infer import LABELS
+from src.components.inference.infer import Verdict
+from src.components.inference.memo import VerdictCache
+from src.components.prompts.judge import PROMPT_WITH_CONTEXT
+from src.utils.stats import percentile
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class JudgeRequest:
+    """One queued judge request"""
+
+    fields: Dict[str, str]
+    num_tokens: int
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.perf_counter)
+    cache_key: Optional[str] = None
+
+
+class JudgeEngine:
+    """Asyncio judge server with dynamic batching
+
+    Requests are queued and grouped into batches: a batch is sent to the
+    model as soon as it holds `max_batch_size` requests or
+    `max_batch_tokens` estimated prompt tokens, or `max_wait_ms` after its
+    first request arrived. Batches run one at a time in a worker thread
+    with `Inference.score`, and every caller's future resolves with its own
+    verdict. With a `VerdictCache`, cached verdicts are returned without
+    being queued.
+    """
+
+    def __init__(
+        self,
+        inference: Inference,
+        prompt_base: str = PROMPT_WITH_CONTEXT,
+        labels: Sequence[str] = LABELS,
+        max_batch_size: int = 32,
+        max_batch_tokens: int = 32768,
+        max_wait_ms: float = 10.0,
+        chars_per_token: float = 4.0,
+        latency_window: int = 10000,
+        cache: Optional[VerdictCache] = None,
+    ):
+        self.inference = inference
+        self.prompt_base = prompt_base
+        self.labels = labels
+        self.max_batch_size = max_batch_size
+        self.max_batch_tokens = max_batch_tokens
+        self.max_wait_ms = max_wait_ms
+        self.chars_per_token = chars_per_token
+        self.cache = cache
+        self.queue: Optional[asyncio.Queue] = None
+        self.batch_sizes: Counter = Counter()
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+        self.num_requests = 0
+        self.num_batches = 0
+        self._task: Optional[asyncio.Task] = None
+        # Request that did not fit the previous batch; it opens the next one.
+        self._carry: Optional[JudgeRequest] = None
+        # Requests taken off the queue: the batch being built or scored.
+        self._batch: List[JudgeRequest] = []
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='judge-engine',
+        )
+
+    @classmethod
+    def from_model_manager(
+        cls,
+        model_manager: Any,
+        device: str = 'cuda',
+        prefix_cache: bool = True,
+        **kwargs: Any,
+    ) -> 'JudgeEngine':
+        """Build an engine around the model loaded by a ModelManager"""
+        inference = Inference(device=device, prefix_cache=prefix_cache)
+        inference.get_model(
+            model_manager.get_model(), model_manager.get_tokenizer(),
+        )
+        return cls(inference, **kwargs)
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self.queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        # A batch still scoring in the worker thread cannot be interrupted:
+        # its callers are failed now and its late result is dropped.
+        pending = self._batch
+        self._batch = []
+        if self._carry is not None:
+            pending.append(self._carry)
+        self._carry = None
+        while self.queue is not None and not self.queue.empty():
+            pending.append(self.queue.get_nowait())
+        for request in pending:
+            if not request.future.done():
+                request.future.set_exception(RuntimeError('Engine stopped'))
+
+    async def judge(self, query: str, chunk: str, response: str) -> Verdict:
+        """Judge one (query, chunk, response) triple"""
+        return await self.submit(
+            {'instruction': query, 'input': chunk, 'output': response},
+        )
+
+    async def submit(self, fields: Dict[str, str]) -> Verdict:
+        """Queue prompt fields and wait for their verdict"""
+        if self.queue is None:
+            raise RuntimeError('Engine not started. Call start() first.')
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self.cache.key(
+                fields, self.prompt_base, self.labels,
+                self.inference.temperature,
+            )
+            verdict = self.cache.get(cache_key)
+            if verdict is not None:
+                return verdict
+        size = sum(len(str(value)) for value in fields.values())
+        request = JudgeRequest(
+            fields=fields,
+            num_tokens=int(
+                (len(self.prompt_base) + size) / self.chars_per_token,
+            ),
+            future=asyncio.get_running_loop().create_future(),
+            cache_key=cache_key,
+        )
+        await self.queue.put(request)
+        return await request.future
+
+    async def _next_batch(self) -> List[JudgeRequest]:
+        if self._carry is not None:
+            batch = self._batch = [self._carry]
+            self._carry = None
+        else:
+            batch = self._batch = [await self.queue.get()]
+        tokens = batch[0].num_tokens
+        deadline = batch[0].enqueued + self.max_wait_ms / 1000
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.perf_counter()
+            if not self.queue.empty():
+                request = self.queue.get_nowait()
+            elif timeout <= 0:
+                break
+            else:
+                try:
+                    request = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+            if tokens + request.num_tokens > self.max_batch_tokens:
+                self._carry = request
+                break
+            batch.append(request)
+            tokens += request.num_tokens
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            batch = self._batch = [
+                r for r in batch if not r.future.cancelled()
+            ]
+            if not batch:
+                continue
+            try:
+                verdicts = await loop.run_in_executor(
+                    self._executor, self._score, batch,
+                )
+            except Exception as error:
+                logger.exception('Judge batch of %d failed', len(batch))
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(error)
+                self._batch = []
+                continue
+
+            self._batch = []
+            now = time.perf_counter()
+            self.num_batches += 1
+            self.batch_sizes[len(batch)] += 1
+            for request, verdict in zip(batch, verdicts):
+                self.num_requests += 1
+                self.latencies.append(now - request.enqueued)
+                if not request.future.done():
+                    request.future.set_result(verdict)
+
+    def _score(self, batch: List[JudgeRequest]) -> List[Verdict]:
+        verdicts = self.inference.score(
+            self.prompt_base,
+            [request.fields for request in batch],
+            labels=self.labels,
+            max_batch_tokens=self.max_batch_tokens,
+        )
+        if self.cache is not None:
+            for request, verdict in zip(batch, verdicts):
+                self.cache.put(request.cache_key, verdict)
+        return verdicts
+
+    def metrics(self) -> Dict[str, Any]:
+        """Queue depth, batch size histogram, latency and cache hit rates"""
+        latencies = list(self.latencies)
+        metrics = {
+            'queue_depth': (self.queue.qsize() if self.queue else 0)
+            + (self._carry is not None),
+            'requests': self.num_requests,
+            'batches': self.num_batches,
+            'batch_size_histogram': dict(sorted(self.batch_sizes.items())),
+            'latency_p50_ms': 1000 * percentile(latencies, 50),
+            'latency_p99_ms': 1000 * percentile(latencies, 99),
+        }
+        if self.cache is not None:
+            metrics['cache'] = self.cache.metrics()
+        return metrics
@@ -1,18 +1,58 @@
 from __future__ import annotations
 
-from unsloth import FastLanguageModel
+import inspect
+from dataclasses import dataclass
+from string import Formatter
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+from typing import Tuple
+
+import torch
+from src.components.inference.prefix_cache import PrefixCache
+from src.components.inference.prefix_cache import static_head
+
+LABELS = ('YES', 'NO')
+
+
+@dataclass
+class Verdict:
+    """Label picked by the judge and its probability"""
+
+    label: str
+    probability: float
+    probabilities: Dict[str, float]
+
+
+def static_tail(template: str) -> str:
+    """Static text after the last placeholder of a template"""
+    parsed = list(Formatter().parse(template))
+    if not parsed or parsed[-1][1] is not None:
+        return ''
+    return parsed[-1][0]
 
 
 class Inference:
-    def __init__(self):
+    def __init__(self, device: str = 'cuda', prefix_cache: bool = False):
         self.model = None
         self.tokenizer = None
+        self.device = device
+        # Softmax temperature over the label logits, set by calibrate().
+        self.temperature = 1.0
+        # Reuse the KV cache of the static prompt prefix when scoring.
+        self.prefix_cache = prefix_cache
+        self.prefix_caches: Dict[str, PrefixCache] = {}
 
     def get_model(self, model, tokenizer):
         self.model = model
         self.tokenizer = tokenizer
+        self.prefix_caches = {}
 
     def get_infer(self, prompt):
+        from unsloth import FastLanguageModel
+
         # Enable native 2x faster inference
         FastLanguageModel.for_inference(self.model)
 
@@ -25,15 +65,359 @@ class Inference:
         inputs = self.tokenizer(
             [prompt],
             return_tensors='pt',
-        ).to('cuda')
+        ).to(self.device)
         return inputs
 
-    def infer(self, inputs):
+    def infer(self, inputs, max_new_tokens: int = 2048):
         if self.model is None or self.tokenizer is None:
             raise ValueError(
                 'Model or tokenizer not initialized. Call get_model() first.',
             )
         outputs = self.model.generate(
-            **inputs, max_new_tokens=2048, use_cache=True,
+            **inputs, max_new_tokens=max_new_tokens, use_cache=True,
         )
         return self.tokenizer.batch_decode(outputs)[0]
+
+    def get_batch_inputs(
+        self, prompt_base: str, input_dicts: List[dict],
+    ) -> List[List[int]]:
+        """Tokenize many prompts without padding"""
+        if self.tokenizer is None:
+            raise ValueError(
+                'Tokenizer not initialized. Call get_model() first.',
+            )
+        prompts = [
+            prompt_base.format(**input_dict) for input_dict in input_dicts
+        ]
+        return self.tokenizer(prompts)['input_ids']
+
+    def micro_batches(
+        self,
+        lengths: List[int],
+        max_batch_tokens: int,
+        max_new_tokens: int = 0,
+    ) -> List[List[int]]:
+        """Group prompt indices into batches that fit a token budget
+
+        Prompts are taken longest first, and a batch grows while
+        `batch size * (longest prompt + max_new_tokens)` stays within
+        `max_batch_tokens`. Every batch holds at least one prompt.
+        """
+        order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+        batches: List[List[int]] = []
+        for index in order:
+            if batches:
+                batch = batches[-1]
+                width = lengths[batch[0]] + max_new_tokens
+                if (len(batch) + 1) * width <= max_batch_tokens:
+                    batch.append(index)
+                    continue
+            batches.append([index])
+        return batches
+
+    def pad_left(self, input_ids: List[List[int]]):
+        """Left-pad token ids into a batch of tensors on the device"""
+        padding_side = self.tokenizer.padding_side
+        self.tokenizer.padding_side = 'left'
+        try:
+            batch = self.tokenizer.pad(
+                {'input_ids': input_ids}, padding=True, return_tensors='pt',
+            )
+        finally:
+            self.tokenizer.padding_side = padding_side
+        return batch.to(self.device)
+
+    def infer_batch(
+        self,
+        prompt_base: str,
+        input_dicts: List[dict],
+        max_new_tokens: int = 2048,
+        max_batch_tokens: int = 32768,
+        **generate_kwargs: Any,
+    ) -> List[str]:
+        """Generate for many prompts with left-padded micro-batches
+
+        Args:
+            prompt_base (str): Prompt template.
+            input_dicts (List[dict]): Template fields of every prompt.
+            max_new_tokens (int): Maximum number of generated tokens.
+            max_batch_tokens (int): Token budget of one micro-batch,
+                prompt plus generated tokens of every row.
+            **generate_kwargs: Extra arguments for `model.generate`.
+
+        Returns:
+            List[str]: Generated text of every prompt, in input order.
+        """
+        if self.model is None or self.tokenizer is None:
+            raise ValueError(
+                'Model or tokenizer not initialized. Call get_model() first.',
+            )
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+
+        input_ids = self.get_batch_inputs(prompt_base, input_dicts)
+        results: List[Optional[str]] = [None] * len(input_ids)
+        for batch in self.micro_batches(
+            [len(ids) for ids in input_ids], max_batch_tokens, max_new_tokens,
+        ):
+            inputs = self.pad_left([input_ids[index] for index in batch])
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                pad_token_id=self.tokenizer.pad_token_id,
+                use_cache=True,
+                **generate_kwargs,
+            )
+            texts = self.tokenizer.batch_decode(
+                outputs[:, inputs['input_ids'].shape[1]:],
+                skip_special_tokens=True,
+            )
+            for index, text in zip(batch, texts):
+                results[index] = text
+        return results  # type: ignore
+
+    @staticmethod
+    def scoring_prompt(prompt_base: str) -> str:
+        """Cut the prompt template right before the `{label}` placeholder"""
+        if '{label}' not in prompt_base:
+            raise ValueError(
+                'Scoring needs a prompt with a {label} placeholder',
+            )
+        return prompt_base[:prompt_base.index('{label}')]
+
+    def label_token_ids(
+        self, prompt_tail: str, labels: Sequence[str] = LABELS,
+    ) -> Tuple[int, Dict[str, int]]:
+        """Find the token that starts each label after the prompt
+
+        Tokenizers often merge the space before a label into the label token
+        ('Output: YES' -> 'Output', ':', ' YES'), so the trailing prompt
+        tokens that merge have to be dropped before scoring.
+
+        Args:
+            prompt_tail (str): Static end of the prompt, e.g. 'Output: '.
+            labels (Sequence[str]): Candidate labels.
+
+        Returns:
+            Tuple[int, Dict[str, int]]: Number of trailing prompt tokens to
+            drop and the first token id of every label.
+        """
+        base = self.tokenizer(
+            prompt_tail, add_special_tokens=False,
+        )['input_ids']
+        drop = None
+        token_ids = {}
+        for label in labels:
+            full = self.tokenizer(
+                prompt_tail + label, add_special_tokens=False,
+            )['input_ids']
+            common = 0
+            while (
+                common < min(len(base), len(full))
+                and base[common] == full[common]
+            ):
+                common += 1
+            if common == len(full):
+                raise ValueError(
+                    f'Label {label!r} adds no token to the prompt',
+                )
+            if drop is not None and drop != len(base) - common:
+                raise ValueError('Labels merge differently with the prompt')
+            drop = len(base) - common
+            token_ids[label] = full[common]
+        if len(set(token_ids.values())) != len(token_ids):
+            raise ValueError('Labels must start with different tokens')
+        return drop or 0, token_ids
+
+    def _last_logits_kwargs(self) -> Dict[str, int]:
+        """Ask the model for the last position's logits only, if supported"""
+        model = self.model
+        if hasattr(model, 'get_base_model'):
+            model = model.get_base_model()
+        parameters = inspect.signature(model.forward).parameters
+        for name in ('logits_to_keep', 'num_logits_to_keep'):
+            if name in parameters:
+                return {name: 1}
+        return {}
+
+    def label_logits(
+        self,
+        prompt_base: str,
+        input_dicts: List[dict],
+        labels: Sequence[str] = LABELS,
+        max_batch_tokens: int = 32768,
+    ) -> torch.Tensor:
+        """Logits of every label's first token after each prompt
+
+        One forward pass per micro-batch; nothing is generated.
+
+        Returns:
+            torch.Tensor: Float tensor of shape (len(input_dicts), len(labels)).
+        """
+        if self.model is None or self.tokenizer is None:
+            raise ValueError(
+                'Model or tokenizer not initialized. Call get_model() first.',
+            )
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        prompt = self.scoring_prompt(prompt_base)
+        drop, token_ids = self.label_token_ids(static_tail(prompt), labels)
+        label_ids = torch.tensor([token_ids[label] for label in labels])
+
+        input_ids = self.get_batch_inputs(prompt, input_dicts)
+        if drop:
+            input_ids = [ids[:-drop] for ids in input_ids]
+        scores = torch.empty((len(input_ids), len(labels)))
+        logits_kwargs = self._last_logits_kwargs()
+        cache = self.get_prefix_cache(prompt) if self.prefix_cache else None
+        with torch.inference_mode():
+            for batch in self.micro_batches(
+                [len(ids) for ids in input_ids], max_batch_tokens,
+            ):
+                rows = [input_ids[index] for index in batch]
+                cached = cache is not None and all(
+                    cache.matches(ids) for ids in rows
+                )
+                if cached:
+                    logits = self._last_logits_with_prefix(
+                        cache, rows, logits_kwargs,
+                    )
+                else:
+                    logits = self._last_logits(rows, logits_kwargs)
+                logits = logits[:, label_ids.to(logits.device)]
+                scores[batch] = logits.float().cpu()
+        return scores
+
+    def get_prefix_cache(self, prompt_base: str) -> PrefixCache:
+        """KV cache of the template's static head, built on first use"""
+        prefix = static_head(prompt_base)
+        if prefix not in self.prefix_caches:
+            self.prefix_caches[prefix] = PrefixCache(
+                self.model, self.tokenizer, prefix, self.device,
+            )
+        return self.prefix_caches[prefix]
+
+    def prefix_cache_stats(self) -> Dict[str, float]:
+        """Prompt tokens skipped thanks to the prefix caches"""
+        caches = self.prefix_caches.values()
+        requests = sum(cache.requests for cache in caches)
+        saved = sum(cache.tokens_saved for cache in caches)
+        return {
+            'requests': requests,
+            'tokens_saved': saved,
+            'tokens_saved_per_request': saved / requests if requests else 0.0,
+        }
+
+    def _last_logits(
+        self, rows: List[List[int]], logits_kwargs: Dict[str, int],
+    ) -> torch.Tensor:
+        inputs = self.pad_left(rows)
+        # Left padding: positions must start at each row's first token.
+        position_ids = inputs['attention_mask'].cumsum(-1) - 1
+        position_ids = position_ids.clamp(min=0)
+        return self.model(
+            **inputs,
+            position_ids=position_ids,
+            use_cache=False,
+            **logits_kwargs,
+        ).logits[:, -1, :]
+
+    def _last_logits_with_prefix(
+        self,
+        cache: PrefixCache,
+        rows: List[List[int]],
+        logits_kwargs: Dict[str, int],
+    ) -> torch.Tensor:
+        inputs = self.pad_left([ids[len(cache):] for ids in rows])
+        suffix_mask = inputs['attention_mask']
+        attention_mask = torch.cat(
+            [
+                torch.ones(
+                    (len(rows), len(cache)),
+                    dtype=suffix_mask.dtype,
+                    device=suffix_mask.device,
+                ),
+                suffix_mask,
+            ],
+            dim=1,
+        )
+        position_ids = len(cache) + suffix_mask.cumsum(-1) - 1
+        position_ids = position_ids.clamp(min=len(cache))
+        logits = self.model(
+            input_ids=inputs['input_ids'],
+            attention_mask=attention_mask,
+            position_ids=position_ids,
+            past_key_values=cache.expand(len(rows)),
+            use_cache=True,
+            **logits_kwargs,
+        ).logits[:, -1, :]
+        cache.record(len(rows))
+        return logits
+
+    def score(
+        self,
+        prompt_base: str,
+        input_dicts: List[dict],
+        labels: Sequence[str] = LABELS,
+        max_batch_tokens: int = 32768,
+    ) -> List[Verdict]:
+        """Judge prompts by comparing label logits instead of generating
+
+        Args:
+            prompt_base (str): Prompt template ending with `{label}`.
+            input_dicts (List[dict]): Template fields of every prompt.
+            labels (Sequence[str]): Candidate labels.
+            max_batch_tokens (int): Token budget of one micro-batch.
+
+        Returns:
+            List[Verdict]: Verdict of every prompt, in input order.
+        """
+        scores = self.label_logits(
+            prompt_base, input_dicts, labels, max_batch_tokens,
+        )
+        probabilities = torch.softmax(scores / self.temperature, dim=-1)
+        verdicts = []
+        for row in probabilities.tolist():
+            best = max(range(len(labels)), key=row.__getitem__)
+            verdicts.append(
+                Verdict(
+                    label=labels[best],
+                    probability=row[best],
+                    probabilities=dict(zip(labels, row)),
+                ),
+            )
+        return verdicts
+
+    def calibrate(
+        self,
+        prompt_base: str,
+        input_dicts: List[dict],
+        gold_labels: List[str],
+        labels: Sequence[str] = LABELS,
+        max_batch_tokens: int = 32768,
+    ) -> float:
+        """Fit the softmax temperature on labelled examples
+
+        Temperature scaling keeps the predicted labels and makes the returned
+        probabilities match the observed accuracy on `gold_labels`. The
+        temperature minimizing the negative log-likelihood is picked from a
+        log-spaced grid between 0.01 and 100.
+
+        Returns:
+            float: The fitted temperature, also stored in `self.temperature`.
+        """
+        scores = self.label_logits(
+            prompt_base, input_dicts, labels, max_batch_tokens,
+        )
+        targets = torch.tensor(
+            [list(labels).index(label) for label in gold_labels],
+        )
+        temperatures = torch.logspace(-2, 2, steps=401)
+        losses = torch.stack(
+            [
+                torch.nn.functional.cross_entropy(scores / t, targets)
+                for t in temperatures
+            ],
+        )
+        self.temperature = float(temperatures[int(losses.argmin())])
+        return self.temperature
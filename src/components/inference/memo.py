@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import asdict
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Sequence
+
+from src.components.inference.infer import Inference
+from src.components.inference.infer import LABELS
+from src.components.inference.infer import Verdict
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text: Any) -> str:
+    """Unicode NFKC, whitespace runs collapsed to one space, stripped"""
+    text = unicodedata.normalize('NFKC', str(text))
+    return _WHITESPACE.sub(' ', text).strip()
+
+
+def template_version(template: str) -> str:
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:16]
+
+
+_WEIGHT_SUFFIXES = ('.safetensors', '.bin', '.pt', '.pth')
+
+
+def weights_fingerprint(path: str) -> str:
+    """Hash of the configs and weight file stats in a local model directory
+
+    Changes whenever a model or adapter is saved again to the same path,
+    e.g. a retrained judge written over `rasun_v1/`.
+    """
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(path)):
+        file_path = os.path.join(path, name)
+        if name.endswith('.json'):
+            with open(file_path, 'rb') as f:
+                digest.update(f'{name}:'.encode('utf-8') + f.read())
+        elif name.endswith(_WEIGHT_SUFFIXES):
+            stat = os.stat(file_path)
+            digest.update(
+                f'{name}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8'),
+            )
+    return digest.hexdigest()[:16]
+
+
+def model_identity(model: Any, model_path: Optional[str] = None) -> str:
+    """Base model name, loaded adapters and a fingerprint of local weights
+
+    Args:
+        model (Any): Loaded model, optionally with peft adapters.
+        model_path (str, optional): Path the model was loaded from, when
+            the model itself does not record it.
+    """
+    name = getattr(model, 'name_or_path', None) or getattr(
+        getattr(model, 'config', None), '_name_or_path', '',
+    )
+    adapters = getattr(model, 'peft_config', None) or {}
+    parts = [str(name)]
+    for adapter, config in sorted(adapters.items()):
+        parts.append(
+            f'{adapter}:{getattr(config, "base_model_name_or_path", "")}'
+            f':{getattr(config, "r", "")}',
+        )
+    for path in dict.fromkeys([model_path, str(name)]):
+        if path and os.path.isdir(path):
+            parts.append(f'{path}@{weights_fingerprint(path)}')
+    return '|'.join(parts)
+
+
+class VerdictCache:
+    """Memoize judge verdicts by normalized (query, chunk, response)
+
+    Keys hash the normalized prompt fields together with the model or
+    adapter identity, the template version, the labels and the calibration
+    temperature. Verdicts live in an in-memory LRU tier and, when `db_path`
+    is set, in a SQLite tier whose entries expire after `ttl_seconds`.
+    """
+
+    def __init__(
+        self,
+        model_id: str,
+        max_entries: int = 100_000,
+        db_path: Optional[str] = None,
+        ttl_seconds: Optional[float] = None,
+    ):
+        self.model_id = model_id
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory: OrderedDict = OrderedDict()
+        self.lock = threading.Lock()
+        self.counts = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        self.db: Optional[sqlite3.Connection] = None
+        if db_path:
+            self.db = sqlite3.connect(db_path, check_same_thread=False)
+            self.db.execute('PRAGMA journal_mode=WAL')
+            self.db.execute(
+                'CREATE TABLE IF NOT EXISTS verdicts (key TEXT PRIMARY KEY, '
+                'value TEXT NOT NULL, created REAL NOT NULL)',
+            )
+            self.db.commit()
+
+    def key(
+        self,
+        fields: Dict[str, Any],
+        prompt_base: str,
+        labels: Sequence[str] = LABELS,
+        temperature: float = 1.0,
+    ) -> str:
+        payload = json.dumps(
+            {
+                'model': self.model_id,
+                'template': template_version(prompt_base),
+                'labels': list(labels),
+                'temperature': temperature,
+                'fields': {
+                    name: normalize(value)
+                    for name, value in sorted(fields.items())
+                },
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Verdict]:
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.counts['memory_hits'] += 1
+                return self.memory[key]
+            verdict = self._get_disk(key)
+            if verdict is None:
+                self.counts['misses'] += 1
+                return None
+            self.counts['disk_hits'] += 1
+            self._put_memory(key, verdict)
+            return verdict
+
+    def put(self, key: str, verdict: Verdict) -> None:
+        with self.lock:
+            self._put_memory(key, verdict)
+            if self.db is not None:
+                self.db.execute(
+                    'INSERT OR REPLACE INTO verdicts VALUES (?, ?, ?)',
+                    (key, json.dumps(asdict(verdict)), time.time()),
+                )
+                self.db.commit()
+
+    def _put_memory(self, key: str, verdict: Verdict) -> None:
+        self.memory[key] = verdict
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def _get_disk(self, key: str) -> Optional[Verdict]:
+        if self.db is None:
+            return None
+        row = self.db.execute(
+            'SELECT value, created FROM verdicts WHERE key = ?', (key,),
+        ).fetchone()
+        if row is None:
+            return None
+        value, created = row
+        expired = (
+            self.ttl_seconds is not None
+            and time.time() - created > self.ttl_seconds
+        )
+        if expired:
+            self.db.execute('DELETE FROM verdicts WHERE key = ?', (key,))
+            self.db.commit()
+            return None
+        return Verdict(**json.loads(value))
+
+    def purge_expired(self) -> int:
+        """Delete expired SQLite entries; returns how many were removed"""
+        if self.db is None or self.ttl_seconds is None:
+            return 0
+        with self.lock:
+            cursor = self.db.execute(
+                'DELETE FROM verdicts WHERE created < ?',
+                (time.time() - self.ttl_seconds,),
+            )
+            self.db.commit()
+            return cursor.rowcount
+
+    def score(
+        self,
+        inference: Inference,
+        prompt_base: str,
+        input_dicts: List[dict],
+        labels: Sequence[str] = LABELS,
+        max_batch_tokens: int = 32768,
+    ) -> List[Verdict]:
+        """Inference.score with cached verdicts returned without a model pass
+
+        Misses are scored in one call, and repeated triples within the call
+        are scored once.
+        """
+        keys = [
+            self.key(fields, prompt_base, labels, inference.temperature)
+            for fields in input_dicts
+        ]
+        verdicts: List[Optional[Verdict]] = [self.get(key) for key in keys]
+        missing: Dict[str, int] = {}
+        for index, (key, verdict) in enumerate(zip(keys, verdicts)):
+            if verdict is None and key not in missing:
+                missing[key] = index
+        if missing:
+            scored = inference.score(
+                prompt_base,
+                [input_dicts[index] for index in missing.values()],
+                labels=labels,
+                max_batch_tokens=max_batch_tokens,
+            )
+            for key, verdict in zip(missing, scored):
+                self.put(key, verdict)
+            by_key = dict(zip(missing, scored))
+            verdicts = [
+                verdict if verdict is not None else by_key[key]
+                for key, verdict in zip(keys, verdicts)
+            ]
+        return verdicts  # type: ignore
+
+    def metrics(self) -> Dict[str, Any]:
+        with self.lock:
+            counts = dict(self.counts)
+            lookups = sum(counts.values())
+            hits = counts['memory_hits'] + counts['disk_hits']
+            return {
+                **counts,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'memory_entries': len(self.memory),
+            }
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import copy
+import logging
+from string import Formatter
+from typing import Any
+from typing import List
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+
+def static_head(template: str) -> str:
+    """Static text before the first placeholder of a template"""
+    parsed = list(Formatter().parse(template))
+    return parsed[0][0] if parsed else ''
+
+
+class PrefixCache:
+    """KV cache of a static prompt prefix, computed once per model and device
+
+    Every judge prompt starts with the same instruction block. Its keys and
+    values are computed once here and copied into each batch, so a forward
+    pass only has to process the tokens after the prefix.
+
+    The last prefix token is left out of the cache: it can merge with the
+    text that follows it, so only the tokens before it are known to be
+    identical in every prompt.
+    """
+
+    def __init__(self, model: Any, tokenizer: Any, prefix: str, device: str):
+        self.prefix = prefix
+        self.device = device
+        self.input_ids: List[int] = tokenizer(prefix)['input_ids'][:-1]
+        self.requests = 0
+        self.tokens_saved = 0
+        with torch.inference_mode():
+            outputs = model(
+                input_ids=torch.tensor([self.input_ids], device=device),
+                use_cache=True,
+            )
+        self.past_key_values = outputs.past_key_values
+        logger.info(
+            'Cached %d prefix tokens on %s', len(self.input_ids), device,
+        )
+
+    def __len__(self) -> int:
+        return len(self.input_ids)
+
+    def matches(self, input_ids: List[int]) -> bool:
+        return input_ids[:len(self.input_ids)] == self.input_ids
+
+    def expand(self, batch_size: int) -> Any:
+        """Copy of the cached keys and values repeated for a batch"""
+        if isinstance(self.past_key_values, tuple):
+            return tuple(
+                tuple(
+                    tensor.expand(batch_size, *tensor.shape[1:])
+                    for tensor in layer
+                )
+                for layer in self.past_key_values
+            )
+        cache = copy.deepcopy(self.past_key_values)
+        cache.batch_repeat_interleave(batch_size)
+        return cache
+
+    def record(self, num_requests: int) -> None:
+        self.requests += num_requests
+        self.tokens_saved += num_requests * len(self.input_ids)
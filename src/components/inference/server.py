@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from dataclasses import asdict
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from src.components.inference.engine import JudgeEngine
+
+logger = logging.getLogger(__name__)
+
+
+class JudgeServer:
+    """Local HTTP front end for a JudgeEngine
+
+    The engine runs on an asyncio loop in a background thread. Every HTTP
+    request is handled on its own thread and submitted to that loop, so
+    concurrent requests are coalesced into the engine's batches.
+
+    Endpoints:
+        POST /judge        {"query", "chunk", "response"} -> verdict
+        POST /judge/batch  {"items": [...]} -> {"results": [verdict, ...]}
+        GET  /metrics      engine metrics
+        GET  /health       {"status": "ok"}
+    """
+
+    def __init__(
+        self,
+        engine: JudgeEngine,
+        host: str = '127.0.0.1',
+        port: int = 8000,
+        request_timeout: float = 300.0,
+    ):
+        self.engine = engine
+        self.request_timeout = request_timeout
+        self.loop = asyncio.new_event_loop()
+        self._loop_thread = threading.Thread(
+            target=self.loop.run_forever, name='judge-loop', daemon=True,
+        )
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.httpd.daemon_threads = True
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        return self.httpd.server_address[:2]
+
+    def start(self) -> None:
+        """Start the engine loop; call serve_forever() to handle requests"""
+        self._loop_thread.start()
+        self._call(self.engine.start())
+
+    def serve_forever(self) -> None:
+        host, port = self.address
+        logger.info('Judge server listening on http://%s:%d', host, port)
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.shutdown()
+
+    def shutdown(self) -> None:
+        self.httpd.server_close()
+        if self.loop.is_running():
+            self._call(self.engine.stop())
+            self.loop.call_soon_threadsafe(self.loop.stop)
+
+    def _call(self, coroutine: Any) -> Any:
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        return future.result(self.request_timeout)
+
+    def judge(self, item: Dict[str, Any]) -> Dict[str, Any]:
+        return asdict(self._call(self.engine.judge(*parse_item(item))))
+
+    def judge_batch(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        async def gather():
+            return await asyncio.gather(
+                *[self.engine.judge(*parse_item(item)) for item in items],
+            )
+
+        return [asdict(verdict) for verdict in self._call(gather())]
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/health':
+                    self._send(200, {'status': 'ok'})
+                elif self.path == '/metrics':
+                    self._send(200, server.engine.metrics())
+                else:
+                    self._send(404, {'error': f'Unknown path {self.path}'})
+
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    body = json.loads(self.rfile.read(length) or b'{}')
+                    if self.path == '/judge':
+                        self._send(200, server.judge(body))
+                    elif self.path == '/judge/batch':
+                        items = body.get('items')
+                        if not isinstance(items, list):
+                            raise ValueError("'items' must be a list")
+                        self._send(
+                            200, {'results': server.judge_batch(items)},
+                        )
+                    else:
+                        self._send(404, {'error': f'Unknown path {self.path}'})
+                except (ValueError, KeyError, TypeError) as error:
+                    self._send(400, {'error': str(error)})
+                except Exception as error:
+                    logger.exception('Judge request failed')
+                    self._send(500, {'error': str(error)})
+
+            def _send(self, status: int, payload: Dict[str, Any]) -> None:
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                logger.debug(format, *args)
+
+        return Handler
+
+
+def parse_item(item: Any) -> Tuple[str, str, str]:
+    """Read (query, chunk, response) from a request item"""
+    if not isinstance(item, dict):
+        raise ValueError('Each item must be a JSON object')
+    missing = [key for key in ('query', 'response') if key not in item]
+    if missing:
+        raise ValueError(f'Missing fields: {", ".join(missing)}')
+    return str(item['query']), str(item.get('chunk', '')), str(item['response'])
+
+
+def serve(
+    engine: JudgeEngine,
+    host: str = '127.0.0.1',
+    port: int = 8000,
+    request_timeout: Optional[float] = 300.0,
+) -> None:
+    """Run a JudgeServer until interrupted"""
+    server = JudgeServer(
+        engine, host=host, port=port, request_timeout=request_timeout,
+    )
+    server.start()
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
@@ -3,8 +3,6 @@ from __future__ import annotations
 from typing import List
 from typing import Optional
 
-from unsloth import FastLanguageModel
-
 
 class ModelManager:
     def __init__(self):
@@ -17,7 +15,43 @@ class ModelManager:
         max_length: int = 2048,
         dtype: Optional[str] = None,
         load_in_4bit: bool = False,
+        backend: str = 'unsloth',
+        device: str = 'cpu',
     ) -> None:
+        """Load a model and its tokenizer.
+
+        `backend='unsloth'` (the default) needs a GPU. `backend='transformers'`
+        loads a plain Hugging Face causal LM on `device`, e.g. a tiny model on
+        CPU for testing the inference stack; with `load_in_4bit` it is
+        quantized through bitsandbytes, which needs a CUDA device.
+        """
+        if backend == 'transformers':
+            from transformers import AutoModelForCausalLM
+            from transformers import AutoTokenizer
+
+            if load_in_4bit:
+                from transformers import BitsAndBytesConfig
+
+                # Quantized weights are placed on load and cannot be moved.
+                model = AutoModelForCausalLM.from_pretrained(
+                    model_name,
+                    torch_dtype=dtype or 'auto',
+                    quantization_config=BitsAndBytesConfig(load_in_4bit=True),
+                    device_map={'': device},
+                )
+            else:
+                model = AutoModelForCausalLM.from_pretrained(
+                    model_name, torch_dtype=dtype or 'auto',
+                ).to(device)
+            model.eval()
+            self.model = model
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            return
+        if backend != 'unsloth':
+            raise ValueError(f'Unknown backend {backend!r}')
+
+        from unsloth import FastLanguageModel
+
         model, tokenizer = FastLanguageModel.from_pretrained(
             model_name,
             max_length=max_length,
@@ -49,6 +83,8 @@ class ModelManager:
         init_lora_weights: bool = True,
         loftq_config: dict = {},
     ) -> None:
+        from unsloth import FastLanguageModel
+
         self.model = FastLanguageModel.get_peft_model(
             self.model,
             r=r,
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Iterator
+from typing import Optional
+
+from src.base import BaseParse
+from src.base import ParseInput
+from src.base import ParseOutput
+from src.components.parsing.local import LocalParse
+from src.models import FileType
+from src.utils.hashing import file_sha256
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.path.expanduser('~'), '.cache', 'rasun', 'parsed',
+)
+
+
+def concrete_parser(parser: BaseParse, file_type: FileType) -> BaseParse:
+    """Parser that handles `file_type`, resolved through AutoParse"""
+    parser_for = getattr(parser, 'parser_for', None)
+    return parser if parser_for is None else parser_for(file_type)
+
+
+class ParseCache:
+    """Content-addressed on-disk store of parsed text
+
+    Entries are keyed by the file's content hash, its FileType and the
+    class, version and settings of the parser that handles that type, so
+    renamed or touched files still hit while a parser upgrade or a changed
+    setting misses. Each entry is a gzip-compressed JSONL file
+    with one page per line, read back one page at a time.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def key(
+        self,
+        file_path: str,
+        file_type: FileType,
+        parser: BaseParse,
+        content_hash: Optional[str] = None,
+    ) -> str:
+        parser = concrete_parser(parser, file_type)
+        parser_class = type(parser)
+        payload = json.dumps(
+            {
+                'file_sha256': content_hash or file_sha256(file_path),
+                'file_type': FileType(file_type).value,
+                'parser': f'{parser_class.__module__}.'
+                f'{parser_class.__qualname__}',
+                'version': parser.version,
+                'settings': sorted(vars(parser).items()),
+            },
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], f'{key}.jsonl.gz')
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def load(self, key: str) -> Optional[Iterator[str]]:
+        """Pages of a cached entry, read lazily, or None on a miss"""
+        path = self.path(key)
+        if not os.path.exists(path):
+            return None
+        os.utime(path)
+        return self._read(path)
+
+    @staticmethod
+    def _read(path: str) -> Iterator[str]:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            for line in f:
+                yield json.loads(line)
+
+    def store(self, key: str, pages: Iterator[str]) -> Iterator[str]:
+        """Pass pages through while writing them under `key`
+
+        The entry only appears once every page has been written: a failed
+        or abandoned parse leaves nothing behind.
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp-{uuid.uuid4().hex}'
+        complete = False
+        try:
+            with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+                for page in pages:
+                    f.write(json.dumps(page, ensure_ascii=False) + '\n')
+                    yield page
+            os.replace(tmp_path, path)
+            complete = True
+        finally:
+            if not complete and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def remove(self, key: str) -> None:
+        if key in self:
+            os.remove(self.path(key))
+
+
+class CachedParse(LocalParse):
+    """LocalParse in front of a ParseCache
+
+    Unchanged files are streamed back from the cache instead of being
+    parsed again; others are parsed and stored as they stream.
+    """
+
+    def __init__(self, parser: LocalParse, cache: Optional[ParseCache] = None):
+        self.parser = parser
+        self.cache = cache or ParseCache()
+        self.io_bound = parser.io_bound
+        self.separator = parser.separator
+        self.version = parser.version
+        self.hits = 0
+        self.misses = 0
+
+    def iter_parse(
+        self, input: ParseInput, content_hash: Optional[str] = None,
+    ) -> Iterator[str]:
+        """Pages of the file, from the cache when its content is known
+
+        Args:
+            input (ParseInput): File to parse.
+            content_hash (str, optional): sha256 of the file when the caller
+                already has it.
+        """
+        start = time.perf_counter()
+        key = self.cache.key(
+            input.file_path, input.file_type, self.parser, content_hash,
+        )
+        pages = self.cache.load(key)
+        if pages is not None:
+            self.hits += 1
+            logger.debug(
+                'Parse cache hit for %s (%.3fs)',
+                input.file_path, time.perf_counter() - start,
+            )
+            return pages
+        self.misses += 1
+        return self.cache.store(key, self.parser.iter_parse(input))
+
+    def parse(
+        self, input: ParseInput, content_hash: Optional[str] = None,
+    ) -> ParseOutput:
+        """Whole text, joined like the uncached parser of its file type"""
+        if not isinstance(input.file_path, str):
+            raise ValueError(
+                'LocalParse parses one file, use ParseEngine for many',
+            )
+        pages = list(self.iter_parse(input, content_hash))
+        separator = concrete_parser(self.parser, input.file_type).separator
+        return ParseOutput(
+            parsed_data=separator.join(pages),
+            source=input.file_path,
+            metadata={'pages': len(pages)},
+        )
@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import csv
+from typing import Iterator
+from typing import List
+
+from src.base import ParseInput
+from src.components.parsing.local import LocalParse
+
+
+class CsvParse(LocalParse):
+    """Rows of a CSV file as tab-separated text, `block_size` rows at a time"""
+
+    def __init__(self, block_size: int = 1000, encoding: str = 'utf-8'):
+        self.block_size = block_size
+        self.encoding = encoding
+
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        with open(
+            input.file_path, newline='', encoding=self.encoding,
+            errors='replace',
+        ) as f:
+            lines: List[str] = []
+            for row in csv.reader(f):
+                lines.append('\t'.join(row))
+                if len(lines) == self.block_size:
+                    yield '\n'.join(lines)
+                    lines = []
+            if lines:
+                yield '\n'.join(lines)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import shutil
+import subprocess
+from typing import Iterator
+
+from src.base import ParseInput
+from src.components.parsing.local import LocalParse
+
+
+class DocParse(LocalParse):
+    """Text of a legacy .doc file via the `antiword` command
+
+    antiword's output is read as it is produced and split into pages on
+    its form feeds.
+    """
+
+    def __init__(self, command: str = 'antiword'):
+        self.command = command
+
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        if shutil.which(self.command) is None:
+            raise RuntimeError(
+                f'{self.command} is not installed, it is needed for .doc',
+            )
+        process = subprocess.Popen(
+            [self.command, '-f', input.file_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+        )
+        page = []
+        for line in process.stdout:
+            *done, rest = line.split('\f')
+            for part in done:
+                page.append(part)
+                yield ''.join(page)
+                page = []
+            page.append(rest)
+        if page:
+            yield ''.join(page)
+        stderr = process.stderr.read()
+        if process.wait() != 0:
+            raise RuntimeError(
+                f'{self.command} failed on {input.file_path}: '
+                f'{stderr.strip()}',
+            )
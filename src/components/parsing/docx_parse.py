@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from typing import Iterator
+from typing import List
+
+from docx import Document
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+from src.base import ParseInput
+from src.components.parsing.local import LocalParse
+
+
+def has_page_break(paragraph: Paragraph) -> bool:
+    """Explicit page break, or a break Word recorded when it last saved"""
+    return paragraph.contains_page_break or bool(
+        paragraph._p.xpath('./w:r/w:br[@w:type="page"]'),
+    )
+
+
+class DocxParse(LocalParse):
+    """Text of a DOCX file in document order, with python-docx
+
+    DOCX has no fixed pages: a block is yielded at every page break and
+    otherwise every `block_size` paragraphs. Table rows are
+    written as tab-separated cells.
+    """
+
+    io_bound = False
+
+    def __init__(self, block_size: int = 200):
+        self.block_size = block_size
+
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        document = Document(input.file_path)
+        lines: List[str] = []
+        for item in document.iter_inner_content():
+            if isinstance(item, Table):
+                for row in item.rows:
+                    lines.append('\t'.join(cell.text for cell in row.cells))
+                continue
+            lines.append(item.text)
+            if isinstance(item, Paragraph) and (
+                has_page_break(item) or len(lines) >= self.block_size
+            ):
+                yield '\n'.join(lines)
+                lines = []
+        if lines:
+            yield '\n'.join(lines)
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import signal
+import time
+from concurrent.futures import Executor
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import Future
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.queues import SimpleQueue
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+from typing import Set
+from typing import Tuple
+
+from src.base import BaseParse
+from src.base import ParseInput
+from src.base import ParseOutput
+from src.models import FileType
+
+logger = logging.getLogger(__name__)
+
+# Path, file type, content hash and start time of a submitted file.
+_Pending = Tuple[str, FileType, Optional[str], float]
+
+
+def file_type_of(file_path: str) -> FileType:
+    """FileType from a file extension"""
+    extension = os.path.splitext(file_path)[1].lower().lstrip('.')
+    if extension == 'htm':
+        extension = 'html'
+    try:
+        return FileType(extension)
+    except ValueError:
+        raise ValueError(f'Unsupported file type: {file_path}') from None
+
+
+def parse_file(
+    parser: BaseParse,
+    file_path: str,
+    file_type: FileType,
+    content_hash: Optional[str] = None,
+) -> ParseOutput:
+    """Parse one file, returning failures as a ParseOutput with `error`
+
+    A known `content_hash` is handed to parsers that accept one (CachedParse)
+    so the file is not hashed again.
+    """
+    start = time.perf_counter()
+    input = ParseInput(file_path=file_path, file_type=file_type)
+    try:
+        if content_hash is None:
+            output = parser.parse(input)
+        else:
+            output = parser.parse(input, content_hash=content_hash)
+    except Exception as error:
+        output = ParseOutput(
+            parsed_data='', error=f'{type(error).__name__}: {error}',
+        )
+    output.source = file_path
+    output.metadata.update(
+        file_type=file_type.value,
+        size_bytes=os.path.getsize(file_path)
+        if os.path.exists(file_path) else None,
+        seconds=time.perf_counter() - start,
+    )
+    return output
+
+
+def _report_pid(pids: SimpleQueue) -> None:
+    pids.put(os.getpid())
+
+
+class _ParsePool(ProcessPoolExecutor):
+    """Spawned process pool whose workers can be terminated
+
+    Workers are spawned rather than forked, since the parent may already
+    run threads of a torch or sentence-transformers backend. Each worker
+    reports its pid on start-up, so hung workers can be terminated without
+    reaching into the executor's internals.
+    """
+
+    def __init__(self, max_workers: int):
+        context = multiprocessing.get_context('spawn')
+        self.pids = context.SimpleQueue()
+        self.worker_pids: Set[int] = set()
+        super().__init__(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=_report_pid,
+            initargs=(self.pids,),
+        )
+
+    def terminate_workers(self) -> None:
+        while not self.pids.empty():
+            self.worker_pids.add(self.pids.get())
+        for pid in self.worker_pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+
+class ParseEngine:
+    """Parse many files concurrently with one BaseParse implementation
+
+    Files go to a thread pool when the parser is I/O-bound
+    (`BaseParse.io_bound`) and to a process pool otherwise. At most
+    `max_workers` files are in flight, and one ParseOutput per file is
+    yielded as soon as it finishes, with its path in `source`.
+
+    A file still running after `timeout` seconds is reported with an error
+    and the executor is replaced, so a hung file never holds a slot. Process
+    workers are terminated and the other files they were running are
+    resubmitted; a hung thread cannot be stopped and is left to finish in
+    the background. A worker process that crashes is reported as an error
+    for the files it took down, and the pool is rebuilt for the rest.
+    """
+
+    def __init__(
+        self,
+        parser: BaseParse,
+        max_workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        use_processes: Optional[bool] = None,
+    ):
+        """
+        Args:
+            parser (BaseParse): Parser applied to every file. Must be
+                picklable when run in processes.
+            max_workers (int, optional): Concurrent files. Defaults to the
+                CPU count, or 4x the CPU count for I/O-bound parsers.
+            timeout (float, optional): Seconds allowed per file.
+            use_processes (bool, optional): Overrides `parser.io_bound`.
+        """
+        self.parser = parser
+        self.use_processes = (
+            not parser.io_bound if use_processes is None else use_processes
+        )
+        cpus = os.cpu_count() or 1
+        self.max_workers = max_workers or (
+            cpus if self.use_processes else 4 * cpus
+        )
+        self.timeout = timeout
+
+    def _executor(self) -> Executor:
+        if self.use_processes:
+            return _ParsePool(self.max_workers)
+        return ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix='parse',
+        )
+
+    def parse_input(self, input: ParseInput) -> Iterator[ParseOutput]:
+        """One ParseOutput per path of a single- or multi-file ParseInput"""
+        paths = (
+            [input.file_path] if isinstance(input.file_path, str)
+            else input.file_path
+        )
+        return self.parse_many(paths, input.file_type)
+
+    def parse_many(
+        self,
+        file_paths: Iterable[str],
+        file_type: Optional[FileType] = None,
+        content_hashes: Optional[Dict[str, str]] = None,
+    ) -> Iterator[ParseOutput]:
+        """Parse files, yielding each result as soon as it is ready
+
+        Args:
+            file_paths (Iterable[str]): Files to parse.
+            file_type (FileType, optional): Type of every file; taken from
+                each file's extension if None.
+            content_hashes (Dict[str, str], optional): sha256 by path for
+                files the caller already hashed, passed on to the parser.
+        """
+        content_hashes = content_hashes or {}
+        paths = iter(file_paths)
+        pending: Dict[Future, _Pending] = {}
+        exhausted = False
+        executor = self._executor()
+        try:
+            while True:
+                while not exhausted and len(pending) < self.max_workers:
+                    path = next(paths, None)
+                    if path is None:
+                        exhausted = True
+                        break
+                    try:
+                        path_type = file_type or file_type_of(path)
+                    except ValueError as error:
+                        yield ParseOutput(
+                            parsed_data='', source=path, error=str(error),
+                        )
+                        continue
+                    executor = self._submit(
+                        executor,
+                        pending,
+                        (path, path_type, content_hashes.get(path)),
+                    )
+                if not pending:
+                    return
+
+                done, _ = wait(
+                    pending,
+                    timeout=self._wait_timeout(pending),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    path = pending.pop(future)[0]
+                    try:
+                        yield future.result()
+                    except BrokenProcessPool as error:
+                        # A worker died (e.g. a crash in C code); every file
+                        # in flight on that pool is lost with it.
+                        logger.warning(
+                            'Worker crashed while parsing %s', path,
+                        )
+                        yield ParseOutput(
+                            parsed_data='',
+                            source=path,
+                            error=f'BrokenProcessPool: {error}',
+                        )
+                if self.timeout is not None:
+                    expired = list(self._expire(pending))
+                    if expired:
+                        executor = self._restart(executor, pending)
+                    yield from expired
+        finally:
+            if pending:
+                # Abandoned early: stop whatever is still running.
+                for future in pending:
+                    future.cancel()
+                self._kill(executor)
+            else:
+                # Idle workers exit cleanly, including ones still starting.
+                executor.shutdown(wait=True)
+
+    def _submit(
+        self,
+        executor: Executor,
+        pending: Dict[Future, _Pending],
+        task: Tuple[str, FileType, Optional[str]],
+    ) -> Executor:
+        """Submit one file, replacing a process pool broken by a crash"""
+        try:
+            future = executor.submit(parse_file, self.parser, *task)
+        except BrokenProcessPool:
+            executor.shutdown(wait=False, cancel_futures=True)
+            executor = self._executor()
+            future = executor.submit(parse_file, self.parser, *task)
+        pending[future] = (*task, time.monotonic())
+        return executor
+
+    def _kill(self, executor: Executor) -> None:
+        """Shut an executor down without waiting for running files
+
+        Process workers are terminated, so a hung parser cannot outlive
+        the batch. Threads cannot be stopped and finish in the background.
+        """
+        if isinstance(executor, _ParsePool):
+            executor.terminate_workers()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _restart(
+        self,
+        executor: Executor,
+        pending: Dict[Future, _Pending],
+    ) -> Executor:
+        """Fresh executor after a timeout, so hung files free their slots
+
+        Killing the process workers also stops the files still running in
+        them, so those are submitted again to the new pool. Running
+        threads keep their futures and are still collected.
+        """
+        self._kill(executor)
+        executor = self._executor()
+        if self.use_processes:
+            resubmit = list(pending.values())
+            pending.clear()
+            for *task, _ in resubmit:
+                executor = self._submit(executor, pending, tuple(task))
+        return executor
+
+    def _wait_timeout(
+        self, pending: Dict[Future, _Pending],
+    ) -> Optional[float]:
+        if self.timeout is None:
+            return None
+        oldest = min(started for *_, started in pending.values())
+        return max(0.0, oldest + self.timeout - time.monotonic())
+
+    def _expire(
+        self, pending: Dict[Future, _Pending],
+    ) -> Iterator[ParseOutput]:
+        now = time.monotonic()
+        for future, (path, *_, started) in list(pending.items()):
+            if now - started < self.timeout:
+                continue
+            pending.pop(future)
+            future.cancel()
+            logger.warning(
+                'Parsing %s timed out after %.1fs', path, now - started,
+            )
+            yield ParseOutput(
+                parsed_data='',
+                source=path,
+                error=f'Timed out after {self.timeout}s',
+            )
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+
+from src.base import ParseInput
+from src.components.parsing.local import LocalParse
+
+
+def sheet_text(name: str, rows: Iterable[Iterable[Any]]) -> str:
+    """A sheet as its name followed by tab-separated non-empty rows"""
+    lines = [f'# {name}']
+    for row in rows:
+        cells = ['' if value is None else str(value) for value in row]
+        if any(cells):
+            lines.append('\t'.join(cells).rstrip('\t'))
+    return '\n'.join(lines)
+
+
+class XlsxParse(LocalParse):
+    """Text of an XLSX workbook, one sheet at a time
+
+    The workbook is opened read-only, so rows are streamed from the file
+    instead of loading every cell.
+    """
+
+    io_bound = False
+
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(
+            input.file_path, read_only=True, data_only=True,
+        )
+        try:
+            for sheet in workbook.worksheets:
+                rows = sheet.iter_rows(values_only=True)
+                yield sheet_text(sheet.title, rows)
+        finally:
+            workbook.close()
+
+
+class XlsParse(LocalParse):
+    """Text of a legacy XLS workbook, one sheet at a time, with xlrd
+
+    Sheets are loaded on demand and released after they are read.
+    """
+
+    io_bound = False
+
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        import xlrd
+
+        workbook = xlrd.open_workbook(input.file_path, on_demand=True)
+        try:
+            for index in range(workbook.nsheets):
+                sheet = workbook.sheet_by_index(index)
+                yield sheet_text(
+                    sheet.name,
+                    (sheet.row_values(row) for row in range(sheet.nrows)),
+                )
+                workbook.unload_sheet(index)
+        finally:
+            workbook.release_resources()
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+from html.parser import HTMLParser
+from typing import Iterator
+from typing import List
+from typing import Tuple
+
+from src.base import ParseInput
+from src.components.parsing.local import LocalParse
+
+SKIPPED_TAGS = {'script', 'style', 'noscript', 'template', 'head'}
+BLOCK_TAGS = {
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl',
+    'dt', 'figcaption', 'footer', 'form', 'h1', 'h2', 'h3', 'h4', 'h5',
+    'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+    'table', 'td', 'th', 'tr', 'ul',
+}
+
+
+class _TextExtractor(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: List[str] = []
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple]) -> None:
+        if tag in SKIPPED_TAGS:
+            self.skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in SKIPPED_TAGS:
+            self.skip_depth = max(0, self.skip_depth - 1)
+        elif tag in BLOCK_TAGS:
+            self.parts.append('\n')
+
+    def handle_data(self, data: str) -> None:
+        if not self.skip_depth:
+            self.parts.append(data)
+
+    def take(self) -> str:
+        text = ''.join(self.parts)
+        self.parts = []
+        return text
+
+
+def _clean(text: str) -> str:
+    lines = (' '.join(line.split()) for line in text.splitlines())
+    return '\n'.join(line for line in lines if line)
+
+
+class HtmlParse(LocalParse):
+    """Visible text of an HTML file with the standard library parser
+
+    The file is fed to the parser in `read_size` pieces and the complete
+    lines extracted so far are yielded after each one, without scripts and
+    styles and with one line per block element.
+    """
+
+    separator = '\n'
+
+    def __init__(self, read_size: int = 1 << 20, encoding: str = 'utf-8'):
+        self.read_size = read_size
+        self.encoding = encoding
+
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        extractor = _TextExtractor()
+        # Text after the last line break so far: a read can end mid-word.
+        partial = ''
+        with open(
+            input.file_path, encoding=self.encoding, errors='replace',
+        ) as f:
+            while True:
+                data = f.read(self.read_size)
+                if not data:
+                    break
+                extractor.feed(data)
+                complete, newline, partial = (
+                    partial + extractor.take()
+                ).rpartition('\n')
+                if not newline:
+                    partial = complete + partial
+                    continue
+                text = _clean(complete)
+                if text:
+                    yield text
+        extractor.close()
+        text = _clean(partial + extractor.take())
+        if text:
+            yield text
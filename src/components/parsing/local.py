@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from abc import abstractmethod
+from typing import Iterator
+
+from src.base import BaseParse
+from src.base import ParseInput
+from src.base import ParseOutput
+
+
+class LocalParse(BaseParse):
+    """Parser that reads a file locally and streams its text
+
+    `iter_parse` yields the text one page, sheet or block at a time, so a
+    large document never has to be held in memory as one string; `parse`
+    joins the pieces for callers that want the whole text.
+    """
+
+    separator = '\n\n'
+
+    @abstractmethod
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        """Yield the text of the file piece by piece"""
+        raise NotImplementedError
+
+    def parse(self, input: ParseInput) -> ParseOutput:
+        if not isinstance(input.file_path, str):
+            raise ValueError(
+                'LocalParse parses one file, use ParseEngine for many',
+            )
+        pages = list(self.iter_parse(input))
+        return ParseOutput(
+            parsed_data=self.separator.join(pages),
+            source=input.file_path,
+            metadata={'pages': len(pages)},
+        )
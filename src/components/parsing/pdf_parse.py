@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from pypdf import PdfReader
+from src.base import ParseInput
+from src.components.parsing.local import LocalParse
+
+
+class PdfParse(LocalParse):
+    """Text of a PDF, one page at a time, with pypdf"""
+
+    io_bound = False
+
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        reader = PdfReader(input.file_path)
+        for page in reader.pages:
+            yield page.extract_text() or ''
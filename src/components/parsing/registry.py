@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from importlib import import_module
+from typing import Any
+from typing import Dict
+from typing import Iterator
+
+from src.base import ParseInput
+from src.base import ParseOutput
+from src.components.parsing.local import LocalParse
+from src.models import FileType
+
+# Parser classes by file type, imported on first use so that each one
+# only needs its own optional dependency.
+PARSERS = {
+    FileType.PDF: 'src.components.parsing.pdf_parse.PdfParse',
+    FileType.DOCX: 'src.components.parsing.docx_parse.DocxParse',
+    FileType.DOC: 'src.components.parsing.doc_parse.DocParse',
+    FileType.XLSX: 'src.components.parsing.excel_parse.XlsxParse',
+    FileType.XLS: 'src.components.parsing.excel_parse.XlsParse',
+    FileType.CSV: 'src.components.parsing.csv_parse.CsvParse',
+    FileType.TXT: 'src.components.parsing.txt_parse.TxtParse',
+    FileType.HTML: 'src.components.parsing.html_parse.HtmlParse',
+}
+
+
+def get_parser(file_type: FileType, **kwargs: Any) -> LocalParse:
+    """Local parser for a file type"""
+    module_name, class_name = PARSERS[FileType(file_type)].rsplit('.', 1)
+    return getattr(import_module(module_name), class_name)(**kwargs)
+
+
+class AutoParse(LocalParse):
+    """Parses every file with the local parser of its `file_type`"""
+
+    io_bound = False
+
+    def __init__(self, **parser_kwargs: Dict[str, Any]):
+        """
+        Args:
+            parser_kwargs: Keyword arguments per file type, e.g.
+                `csv={'block_size': 500}`.
+        """
+        self.parser_kwargs = parser_kwargs
+        self.parsers: Dict[FileType, LocalParse] = {}
+
+    def parser_for(self, file_type: FileType) -> LocalParse:
+        file_type = FileType(file_type)
+        if file_type not in self.parsers:
+            self.parsers[file_type] = get_parser(
+                file_type, **self.parser_kwargs.get(file_type.value, {}),
+            )
+        return self.parsers[file_type]
+
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        return self.parser_for(input.file_type).iter_parse(input)
+
+    def parse(self, input: ParseInput) -> ParseOutput:
+        return self.parser_for(input.file_type).parse(input)
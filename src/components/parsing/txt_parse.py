@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Iterator
+
+from src.base import ParseInput
+from src.components.parsing.local import LocalParse
+
+
+class TxtParse(LocalParse):
+    """Plain text, split into pages on form feeds
+
+    Text without form feeds is yielded in blocks of whole lines of about
+    `block_chars` characters.
+    """
+
+    separator = ''
+
+    def __init__(self, block_chars: int = 1 << 20, encoding: str = 'utf-8'):
+        self.block_chars = block_chars
+        self.encoding = encoding
+
+    def iter_parse(self, input: ParseInput) -> Iterator[str]:
+        with open(
+            input.file_path, encoding=self.encoding, errors='replace',
+        ) as f:
+            page = []
+            size = 0
+            for line in f:
+                *done, rest = line.split('\f')
+                for part in done:
+                    page.append(part)
+                    yield ''.join(page)
+                    page, size = [], 0
+                page.append(rest)
+                size += len(rest)
+                if size >= self.block_chars:
+                    yield ''.join(page)
+                    page, size = [], 0
+            if any(page):
+                yield ''.join(page)
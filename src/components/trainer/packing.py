@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Sequence
+from typing import Tuple
+
+import torch
+from datasets import Dataset
+
+logger = logging.getLogger(__name__)
+
+IGNORE_INDEX = -100
+
+
+@dataclass
+class PackingStats:
+    """Summary of a packing run"""
+
+    num_examples: int
+    num_sequences: int
+    num_tokens: int
+    capacity: int
+
+    @property
+    def efficiency(self) -> float:
+        """Share of the packed token slots filled with real tokens"""
+        slots = self.num_sequences * self.capacity
+        return self.num_tokens / slots if slots else 0.0
+
+
+def first_fit_decreasing(
+    lengths: Sequence[int], capacity: int,
+) -> List[List[int]]:
+    """Bin-pack example lengths into bins of `capacity` tokens
+
+    Examples are placed longest first into the first bin with enough room.
+    A max segment tree over the remaining room of each bin finds that bin
+    in O(log n), so packing is O(n log n).
+
+    Args:
+        lengths (Sequence[int]): Token length of every example.
+        capacity (int): Tokens per packed sequence.
+
+    Returns:
+        List[List[int]]: Example indices of every bin.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+    size = 1
+    while size < max(1, len(lengths)):
+        size *= 2
+    # tree[size + b] is the room left in bin b; unopened bins have full room.
+    tree = [capacity] * (2 * size)
+    bins: List[List[int]] = []
+    for index in order:
+        length = min(lengths[index], capacity)
+        node = 1
+        while node < size:
+            node = 2 * node if tree[2 * node] >= length else 2 * node + 1
+        slot = node - size
+        if slot == len(bins):
+            bins.append([])
+        bins[slot].append(index)
+        tree[node] -= length
+        node //= 2
+        while node:
+            tree[node] = max(tree[2 * node], tree[2 * node + 1])
+            node //= 2
+    return bins
+
+
+def pack_dataset(
+    dataset: Dataset, max_seq_length: int = 2048,
+) -> Tuple[Dataset, PackingStats]:
+    """Pack a pre-tokenized dataset into sequences of at most `max_seq_length`
+
+    Every packed row has the concatenated `input_ids`, `position_ids` that
+    restart at 0 for each example, and `seq_lengths` with the length of each
+    example so collators can rebuild the boundaries.
+
+    Args:
+        dataset (Dataset): Dataset with `input_ids` and `length` columns.
+        max_seq_length (int): Tokens per packed sequence.
+
+    Returns:
+        Tuple[Dataset, PackingStats]: The packed dataset and its efficiency.
+    """
+    lengths = [min(length, max_seq_length) for length in dataset['length']]
+    bins = first_fit_decreasing(lengths, max_seq_length)
+    source = dataset.select_columns(['input_ids'])
+
+    def pack(batch: Dict[str, List[List[int]]]) -> Dict[str, List[Any]]:
+        input_ids, position_ids, seq_lengths = [], [], []
+        flat = [index for indices in batch['indices'] for index in indices]
+        rows = iter(source[flat]['input_ids'])
+        for indices in batch['indices']:
+            ids: List[int] = []
+            positions: List[int] = []
+            sizes: List[int] = []
+            for _ in indices:
+                example = next(rows)[:max_seq_length]
+                ids.extend(example)
+                positions.extend(range(len(example)))
+                sizes.append(len(example))
+            input_ids.append(ids)
+            position_ids.append(positions)
+            seq_lengths.append(sizes)
+        return {
+            'input_ids': input_ids,
+            'position_ids': position_ids,
+            'seq_lengths': seq_lengths,
+        }
+
+    packed = Dataset.from_dict({'indices': bins}).map(
+        pack, batched=True, remove_columns=['indices'],
+    )
+    stats = PackingStats(
+        num_examples=len(lengths),
+        num_sequences=len(bins),
+        num_tokens=sum(lengths),
+        capacity=max_seq_length,
+    )
+    logger.info(
+        'Packed %d examples into %d sequences of %d tokens: efficiency %.1f%%',
+        stats.num_examples,
+        stats.num_sequences,
+        stats.capacity,
+        100 * stats.efficiency,
+    )
+    return packed, stats
+
+
+def is_unsloth_model(model: Any) -> bool:
+    """True if any submodule runs a forward patched by unsloth"""
+    modules = model.modules() if hasattr(model, 'modules') else [model]
+    return any(
+        getattr(type(module).forward, '__module__', '').startswith('unsloth')
+        for module in modules
+    )
+
+
+class PackedDataCollator:
+    """Collate packed rows so examples in one sequence don't see each other
+
+    Position ids restart at every example boundary, which flash-attention
+    kernels use to split the sequence. Eager and SDPA attention ignore
+    them, so with `block_mask=True` a 4D block-diagonal causal mask is
+    added in the inverted additive form transformers expects for custom
+    masks: 0 where attention is allowed, the minimum of `mask_dtype`
+    elsewhere. The first token of every example and all padding are
+    excluded from the loss.
+    """
+
+    def __init__(
+        self,
+        pad_token_id: int,
+        block_mask: bool = False,
+        mask_dtype: torch.dtype = torch.float32,
+    ):
+        self.pad_token_id = pad_token_id
+        self.block_mask = block_mask
+        self.mask_dtype = mask_dtype
+
+    def __call__(self, features: List[Dict[str, Any]]) -> Dict[str, Any]:
+        width = max(len(feature['input_ids']) for feature in features)
+        input_ids = torch.full(
+            (len(features), width), self.pad_token_id, dtype=torch.long,
+        )
+        position_ids = torch.zeros((len(features), width), dtype=torch.long)
+        labels = torch.full(
+            (len(features), width), IGNORE_INDEX, dtype=torch.long,
+        )
+        mask = None
+        if self.block_mask:
+            mask = torch.zeros(
+                (len(features), 1, width, width), dtype=torch.bool,
+            )
+
+        for row, feature in enumerate(features):
+            ids = torch.tensor(feature['input_ids'], dtype=torch.long)
+            input_ids[row, :len(ids)] = ids
+            position_ids[row, :len(ids)] = torch.tensor(
+                feature['position_ids'], dtype=torch.long,
+            )
+            labels[row, :len(ids)] = ids
+            start = 0
+            for size in feature['seq_lengths']:
+                labels[row, start] = IGNORE_INDEX
+                if mask is not None:
+                    end = start + size
+                    mask[row, 0, start:end, start:end] = torch.tril(
+                        torch.ones((size, size), dtype=torch.bool),
+                    )
+                start += size
+            if mask is not None:
+                # Padding attends to itself so no attention row is empty.
+                padding = torch.arange(len(ids), width)
+                mask[row, 0, padding, padding] = True
+
+        batch = {
+            'input_ids': input_ids,
+            'position_ids': position_ids,
+            'labels': labels,
+        }
+        if mask is not None:
+            batch['attention_mask'] = torch.zeros(
+                mask.shape, dtype=self.mask_dtype,
+            ).masked_fill(~mask, torch.finfo(self.mask_dtype).min)
+        return batch
@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import random
+from typing import Iterator
+from typing import List
+from typing import Sequence
+
+from torch.utils.data import Sampler
+
+
+class LengthBucketSampler(Sampler[int]):
+    """Yield indices so consecutive batches hold examples of similar length
+
+    Examples are sorted by token length and cut into `num_buckets` buckets.
+    Each bucket is shuffled, the buckets are laid end to end and cut into
+    batches of `batch_size`, and the batches are shuffled. Only neighbouring
+    buckets can share a batch, so little of each batch is padding, and the
+    order depends only on `seed` and the epoch.
+
+    The indices of a batch are yielded consecutively, so the sampler can be
+    used directly with a DataLoader of the same `batch_size`.
+    """
+
+    def __init__(
+        self,
+        lengths: Sequence[int],
+        batch_size: int,
+        num_buckets: int = 32,
+        seed: int = 0,
+        drop_last: bool = False,
+    ):
+        if batch_size < 1:
+            raise ValueError('batch_size must be positive')
+        self.lengths = list(lengths)
+        self.batch_size = batch_size
+        self.num_buckets = max(1, num_buckets)
+        self.seed = seed
+        self.drop_last = drop_last
+        self.epoch = 0
+
+    def set_epoch(self, epoch: int) -> None:
+        self.epoch = epoch
+
+    def batches(self) -> List[List[int]]:
+        """Batches of indices for the current epoch"""
+        if not self.lengths:
+            return []
+        rng = random.Random(self.seed + self.epoch)
+        order = sorted(
+            range(len(self.lengths)), key=self.lengths.__getitem__,
+        )
+        bucket_size = -(-len(order) // self.num_buckets)
+        ordered: List[int] = []
+        for start in range(0, len(order), bucket_size):
+            bucket = order[start:start + bucket_size]
+            rng.shuffle(bucket)
+            ordered.extend(bucket)
+
+        batches = [
+            ordered[start:start + self.batch_size]
+            for start in range(0, len(ordered), self.batch_size)
+        ]
+        # A short batch stays last so the DataLoader keeps batch boundaries.
+        last = batches.pop() if len(batches[-1]) < self.batch_size else None
+        rng.shuffle(batches)
+        if last and not self.drop_last:
+            batches.append(last)
+        return batches
+
+    def __iter__(self) -> Iterator[int]:
+        for batch in self.batches():
+            yield from batch
+
+    def __len__(self) -> int:
+        if self.drop_last:
+            return len(self.lengths) // self.batch_size * self.batch_size
+        return len(self.lengths)
@@ -1,15 +1,39 @@
 from __future__ import annotations
 
+import logging
 from typing import Any
+from typing import Optional
 
+import torch
+from src.components.trainer.packing import is_unsloth_model
+from src.components.trainer.packing import pack_dataset
+from src.components.trainer.packing import PackedDataCollator
+from src.components.trainer.packing import PackingStats
+from src.components.trainer.sampler import LengthBucketSampler
 from transformers import TrainingArguments
 from trl import SFTTrainer
 from unsloth import is_bfloat16_supported
 
+logger = logging.getLogger(__name__)
+
+
+class JudgeSFTTrainer(SFTTrainer):
+    """SFTTrainer that can use a custom train sampler"""
+
+    def __init__(self, *args: Any, train_sampler: Any = None, **kwargs: Any):
+        self.train_sampler = train_sampler
+        super().__init__(*args, **kwargs)
+
+    def _get_train_sampler(self, *args: Any, **kwargs: Any):
+        if self.train_sampler is not None:
+            return self.train_sampler
+        return super()._get_train_sampler(*args, **kwargs)
+
 
 class SFTJudge:
     def __init__(self) -> None:
         self.trainer = None
+        self.packing_stats: Optional[PackingStats] = None
 
     def set_trainer(
         self,
@@ -26,15 +50,101 @@ class SFTJudge:
         seed: int = 3407,
         output_dir: str = 'outputs',
         report_to: str = 'none',
+        packing: bool = False,
+        block_mask: Optional[bool] = None,
+        sampler: str = 'random',
+        num_length_buckets: int = 32,
     ) -> None:
-        self.trainer = SFTTrainer(
+        """Build the SFT trainer.
+
+        With `packing=True` the pre-tokenized dataset is bin-packed into
+        `max_seq_length` sequences (first-fit-decreasing) and collated with
+        position ids that restart per example. Only flash-attention-2 uses
+        those to keep examples apart, so `block_mask` (by default on unless
+        the model runs flash_attention_2) adds a block-diagonal attention
+        mask for eager and SDPA attention. Unsloth's patched forward drops
+        the attention mask while training, so packing is refused for models
+        loaded through FastLanguageModel; use `sampler='length'` instead.
+
+        With `sampler='length'` batches are drawn from `num_length_buckets`
+        length buckets using the dataset's precomputed 'length' column, so
+        examples of similar length are padded together.
+        """
+        if sampler not in ('random', 'length'):
+            raise ValueError(
+                f"sampler must be 'random' or 'length', got {sampler!r}",
+            )
+        dataset_kwargs = {}
+        data_collator = None
+        column_names = getattr(train_dataset, 'column_names', None) or []
+        if 'input_ids' in column_names:
+            # Already tokenized by the data module (process(tokenize=True)).
+            dataset_kwargs['skip_prepare_dataset'] = True
+        if packing:
+            if is_unsloth_model(model):
+                raise ValueError(
+                    'Packing is not supported for unsloth models: their '
+                    'training forward ignores the attention mask, so packed '
+                    'examples would attend to each other. Use '
+                    "sampler='length' to reduce padding instead.",
+                )
+            if 'input_ids' not in column_names:
+                raise ValueError(
+                    'Packing needs a pre-tokenized dataset. '
+                    'Use process(tokenize=True) first.',
+                )
+            train_dataset, self.packing_stats = pack_dataset(
+                train_dataset, max_seq_length=max_seq_length,
+            )
+            pad_token_id = tokenizer.pad_token_id
+            if pad_token_id is None:
+                pad_token_id = tokenizer.eos_token_id
+            if block_mask is None:
+                attn_implementation = getattr(
+                    getattr(model, 'config', None), '_attn_implementation',
+                    None,
+                )
+                block_mask = attn_implementation != 'flash_attention_2'
+            if not block_mask:
+                logger.warning(
+                    'Packing without a block mask: examples in a packed row '
+                    'only stay apart under flash_attention_2',
+                )
+            mask_dtype = getattr(model, 'dtype', torch.float32)
+            if not mask_dtype.is_floating_point:
+                mask_dtype = torch.float32
+            data_collator = PackedDataCollator(
+                pad_token_id=pad_token_id,
+                block_mask=block_mask,
+                mask_dtype=mask_dtype,
+            )
+        train_sampler = None
+        if sampler == 'length':
+            if packing:
+                raise ValueError('The length sampler is for unpacked datasets')
+            if 'length' not in column_names:
+                raise ValueError(
+                    "The length sampler needs a 'length' column. "
+                    'Use process(tokenize=True) first.',
+                )
+            train_sampler = LengthBucketSampler(
+                train_dataset['length'],
+                batch_size=per_device_train_batch_size,
+                num_buckets=num_length_buckets,
+                seed=seed,
+            )
+        self.trainer = JudgeSFTTrainer(
             model=model,
+            train_sampler=train_sampler,
             tokenizer=tokenizer,
             train_dataset=train_dataset,
             dataset_text_field='text',
             max_seq_length=max_seq_length,
             dataset_num_proc=2,
-            packing=False,  # Can make training 5x faster for short sequences.
+            dataset_kwargs=dataset_kwargs,
+            data_collator=data_collator,
+            # Packing is done by pack_dataset, not by trl.
+            packing=False,
             args=TrainingArguments(  # type: ignore
                 per_device_train_batch_size=per_device_train_batch_size,
                 gradient_accumulation_steps=gradient_accumulation_steps,
@@ -50,6 +160,8 @@ class SFTJudge:
                 seed=seed,
                 output_dir=output_dir,
                 report_to=report_to,
+                # Keep seq_lengths for PackedDataCollator.
+                remove_unused_columns=not packing,
             ),
         )
 
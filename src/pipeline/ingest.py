@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from dataclasses import asdict
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Tuple
+
+from src.base import BaseParse
+from src.base import ParseOutput
+from src.components.chunking.llamaindex import LlamaIndexChunker
+from src.components.parsing.cache import CachedParse
+from src.components.parsing.engine import ParseEngine
+from src.components.parsing.registry import AutoParse
+from src.models import FileType
+from src.utils.hashing import file_sha256
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = 'manifest.json'
+SHARD_DIR = 'chunks'
+
+
+@dataclass
+class ManifestEntry:
+    """State of one source file when it was last ingested"""
+
+    size: int
+    mtime_ns: int
+    sha256: str
+    shard: str
+    chunks: int
+
+
+@dataclass
+class Changes:
+    """Source files grouped by what happened to them since the last sync"""
+
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    # Size, mtime and hash taken before parsing, stored on ingest, so an
+    # edit made while a file is parsed shows up on the next scan.
+    stats: Dict[str, Tuple[int, int]] = field(default_factory=dict)
+    hashes: Dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class IngestReport:
+    """Outcome of one sync"""
+
+    added: int = 0
+    modified: int = 0
+    removed: int = 0
+    unchanged: int = 0
+    failed: Dict[str, str] = field(default_factory=dict)
+    chunks_written: int = 0
+    seconds: float = 0.0
+
+
+def write_json(path: str, payload: Any) -> None:
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class IncrementalIngestor:
+    """Keep a chunk store in sync with a directory of source documents
+
+    A manifest records the size, mtime and sha256 of every ingested file.
+    On each sync only new or changed files are parsed (through BaseParse)
+    and chunked (through LlamaIndexChunker). Each source file has its own
+    JSONL shard in the chunk store, so a change rewrites that shard alone
+    and a deleted file only removes its shard.
+
+    Files whose size and mtime match the manifest are skipped without
+    reading them. Otherwise the content hash decides, so touched but
+    unchanged files are not re-ingested.
+    """
+
+    def __init__(
+        self,
+        source_dir: str,
+        store_dir: str,
+        chunker: LlamaIndexChunker,
+        parser: Optional[BaseParse] = None,
+        max_workers: Optional[int] = None,
+        chunk_batch_size: int = 16,
+    ):
+        """
+        Args:
+            source_dir (str): Directory of source documents, walked
+                recursively. Files with an unknown extension are ignored.
+            store_dir (str): Directory of the manifest and chunk shards.
+            chunker (LlamaIndexChunker): Chunks the parsed text.
+            parser (BaseParse, optional): Parses every file. Defaults to the
+                local parsers behind a parse cache.
+            max_workers (int, optional): Files parsed concurrently.
+            chunk_batch_size (int): Documents per `chunk_many` call.
+        """
+        self.source_dir = source_dir
+        self.store_dir = store_dir
+        self.chunker = chunker
+        self.parser = parser or CachedParse(AutoParse())
+        self.max_workers = max_workers
+        self.chunk_batch_size = chunk_batch_size
+        self.manifest_path = os.path.join(store_dir, MANIFEST_FILE)
+        self.shard_dir = os.path.join(store_dir, SHARD_DIR)
+        os.makedirs(self.shard_dir, exist_ok=True)
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> Dict[str, ManifestEntry]:
+        if not os.path.exists(self.manifest_path):
+            return {}
+        with open(self.manifest_path, encoding='utf-8') as f:
+            files = json.load(f)['files']
+        return {path: ManifestEntry(**entry) for path, entry in files.items()}
+
+    def _save_manifest(self) -> None:
+        write_json(
+            self.manifest_path,
+            {
+                'source_dir': os.path.abspath(self.source_dir),
+                'files': {
+                    path: asdict(entry)
+                    for path, entry in sorted(self.manifest.items())
+                },
+            },
+        )
+
+    def source_files(self) -> List[str]:
+        """Paths of supported files, relative to the source directory"""
+        supported = {f'.{file_type.value}' for file_type in FileType}
+        paths = []
+        for root, dirs, files in os.walk(self.source_dir):
+            dirs.sort()
+            for name in sorted(files):
+                if os.path.splitext(name)[1].lower() in supported:
+                    paths.append(
+                        os.path.relpath(
+                            os.path.join(root, name), self.source_dir,
+                        ),
+                    )
+        return paths
+
+    def scan(self) -> Changes:
+        """Compare the source directory with the manifest"""
+        changes = Changes()
+        current = self.source_files()
+        present = set()
+        for path in current:
+            full_path = os.path.join(self.source_dir, path)
+            try:
+                stat = os.stat(full_path)
+                entry = self.manifest.get(path)
+                same_stat = entry is not None and (
+                    entry.size == stat.st_size
+                    and entry.mtime_ns == stat.st_mtime_ns
+                )
+                sha256 = None if same_stat else file_sha256(full_path)
+            except FileNotFoundError:
+                # Deleted while scanning: handled like any removed file.
+                continue
+            present.add(path)
+            if same_stat:
+                changes.unchanged.append(path)
+            elif entry is not None and sha256 == entry.sha256:
+                # Touched but identical: remember the new stat only.
+                entry.size, entry.mtime_ns = stat.st_size, stat.st_mtime_ns
+                changes.unchanged.append(path)
+            else:
+                changes.stats[path] = (stat.st_size, stat.st_mtime_ns)
+                changes.hashes[path] = sha256
+                if entry is None:
+                    changes.added.append(path)
+                else:
+                    changes.modified.append(path)
+        changes.removed = sorted(set(self.manifest) - present)
+        return changes
+
+    def shard_path(self, path: str) -> str:
+        name = hashlib.sha1(path.encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.shard_dir, f'{name}.jsonl')
+
+    def _write_shard(self, path: str, chunks: List[str]) -> str:
+        shard = self.shard_path(path)
+        tmp_path = f'{shard}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            for chunk_id, text in enumerate(chunks):
+                record = {'source': path, 'chunk_id': chunk_id, 'text': text}
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(tmp_path, shard)
+        return os.path.basename(shard)
+
+    def _commit(
+        self,
+        parsed: List[ParseOutput],
+        changes: Changes,
+        report: IngestReport,
+    ) -> None:
+        """Chunk a batch of parsed files and replace their shards"""
+        chunks = self.chunker.chunk_many(
+            [output.parsed_data for output in parsed],
+        )
+        for output, file_chunks in zip(parsed, chunks):
+            path = os.path.relpath(output.source, self.source_dir)
+            size, mtime_ns = changes.stats[path]
+            self.manifest[path] = ManifestEntry(
+                size=size,
+                mtime_ns=mtime_ns,
+                sha256=changes.hashes[path],
+                shard=self._write_shard(path, file_chunks),
+                chunks=len(file_chunks),
+            )
+            report.chunks_written += len(file_chunks)
+        self._save_manifest()
+
+    def sync(self) -> IngestReport:
+        """Bring the chunk store up to date with the source directory"""
+        start = time.perf_counter()
+        changes = self.scan()
+        report = IngestReport(
+            added=len(changes.added),
+            modified=len(changes.modified),
+            removed=len(changes.removed),
+            unchanged=len(changes.unchanged),
+        )
+        for path in changes.removed:
+            entry = self.manifest.pop(path)
+            shard = os.path.join(self.shard_dir, entry.shard)
+            if os.path.exists(shard):
+                os.remove(shard)
+        to_ingest = [
+            os.path.join(self.source_dir, path)
+            for path in changes.added + changes.modified
+        ]
+        engine = ParseEngine(self.parser, max_workers=self.max_workers)
+        batch: List[ParseOutput] = []
+        content_hashes = {
+            os.path.join(self.source_dir, path): sha256
+            for path, sha256 in changes.hashes.items()
+        }
+        outputs = engine.parse_many(to_ingest, content_hashes=content_hashes)
+        for output in outputs:
+            if output.error is not None:
+                # Left out of the manifest, so the next sync retries it.
+                report.failed[output.source] = output.error
+                logger.warning(
+                    'Failed to parse %s: %s', output.source, output.error,
+                )
+                continue
+            batch.append(output)
+            if len(batch) == self.chunk_batch_size:
+                self._commit(batch, changes, report)
+                batch = []
+        if batch:
+            self._commit(batch, changes, report)
+        # Saved even without changes: touched files get their new stat.
+        self._save_manifest()
+        report.seconds = time.perf_counter() - start
+        logger.info(
+            'Synced %s: %d added, %d modified, %d removed, %d unchanged, '
+            '%d failed, %d chunks written in %.1fs',
+            self.source_dir, report.added, report.modified, report.removed,
+            report.unchanged, len(report.failed), report.chunks_written,
+            report.seconds,
+        )
+        return report
+
+    def watch(
+        self,
+        interval: float = 5.0,
+        stop: Optional[threading.Event] = None,
+        on_sync: Optional[Callable[[IngestReport], None]] = None,
+    ) -> None:
+        """Sync every `interval` seconds until `stop` is set
+
+        Args:
+            interval (float): Seconds between directory scans.
+            stop (threading.Event, optional): Ends the loop when set.
+            on_sync (Callable, optional): Called with each report that
+                changed the store.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            report = self.sync()
+            if on_sync is not None and (
+                report.added or report.modified or report.removed
+            ):
+                on_sync(report)
+            stop.wait(interval)
+
+    def iter_chunks(self) -> Iterator[Dict[str, Any]]:
+        """Every stored chunk, by source path and chunk order"""
+        for path, entry in sorted(self.manifest.items()):
+            with open(
+                os.path.join(self.shard_dir, entry.shard), encoding='utf-8',
+            ) as f:
+                for line in f:
+                    yield json.loads(line)
@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+import os
+
+import numpy as np
+from src.components.chunking.embedding_cache import EmbeddingCache
+
+
+def test_disk_tier_reads_past_a_torn_trailing_row(tmp_path):
+    vectors = np.arange(12, dtype=np.float32).reshape(3, 4)
+    EmbeddingCache(str(tmp_path)).put_many('model', ['a', 'b', 'c'], vectors)
+    (tier_dir,) = os.listdir(tmp_path)
+    # Half a row, as left by a writer that crashed mid-append.
+    with open(tmp_path / tier_dir / 'vectors.f32', 'ab') as f:
+        f.write(np.ones(2, dtype=np.float32).tobytes())
+
+    cache = EmbeddingCache(str(tmp_path))
+    cached = cache.get_many('model', ['a', 'b', 'c'])
+
+    assert cache.metrics()['disk_hits'] == 3
+    np.testing.assert_array_equal(np.stack(cached), vectors)
+
+    cache.put_many('model', ['d'], np.full((1, 4), 7, dtype=np.float32))
+    fresh = EmbeddingCache(str(tmp_path))
+    np.testing.assert_array_equal(
+        np.stack(fresh.get_many('model', ['a', 'd'])),
+        np.stack([vectors[0], np.full(4, 7, dtype=np.float32)]),
+    )
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+import torch
+from src.components.trainer.packing import is_unsloth_model
+from src.components.trainer.packing import PackedDataCollator
+from transformers import LlamaConfig
+from transformers import LlamaForCausalLM
+
+FIRST = [5, 6, 7, 8]
+SECOND = [9, 10, 11]
+PACKED = {
+    'input_ids': FIRST + SECOND,
+    'position_ids': list(range(len(FIRST))) + list(range(len(SECOND))),
+    'seq_lengths': [len(FIRST), len(SECOND)],
+}
+
+
+def tiny_llama(attn_implementation: str) -> LlamaForCausalLM:
+    torch.manual_seed(0)
+    config = LlamaConfig(
+        vocab_size=32,
+        hidden_size=16,
+        intermediate_size=32,
+        num_hidden_layers=2,
+        num_attention_heads=2,
+        num_key_value_heads=2,
+    )
+    config._attn_implementation = attn_implementation
+    return LlamaForCausalLM(config)
+
+
+@pytest.mark.parametrize('attn_implementation', ['eager', 'sdpa'])
+def test_block_mask_separates_packed_examples_in_training(
+    attn_implementation,
+):
+    model = tiny_llama(attn_implementation).train()
+    batch = PackedDataCollator(
+        pad_token_id=0, block_mask=True, mask_dtype=model.dtype,
+    )([PACKED])
+
+    output = model(**batch)
+    output.loss.backward()
+    alone = model(input_ids=torch.tensor([SECOND])).logits
+
+    torch.testing.assert_close(
+        output.logits[:, len(FIRST):], alone, rtol=1e-5, atol=1e-5,
+    )
+
+
+def test_without_block_mask_packed_examples_leak():
+    model = tiny_llama('eager').train()
+    batch = PackedDataCollator(pad_token_id=0)([PACKED])
+
+    packed = model(**batch).logits[:, len(FIRST):]
+    alone = model(input_ids=torch.tensor([SECOND])).logits
+
+    assert not torch.allclose(packed, alone, atol=1e-5)
+
+
+def test_is_unsloth_model():
+    def fast_forward(self, x):
+        return x
+
+    fast_forward.__module__ = 'unsloth.models.llama'
+    patched = type('LlamaModel', (torch.nn.Module,), {'forward': fast_forward})
+    wrapper = torch.nn.Sequential(patched())
+
+    assert is_unsloth_model(wrapper)
+    assert not is_unsloth_model(tiny_llama('eager'))
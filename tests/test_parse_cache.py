@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import pytest
+from src.base import ParseInput
+from src.components.parsing.cache import CachedParse
+from src.components.parsing.cache import ParseCache
+from src.components.parsing.registry import AutoParse
+
+TXT = ''.join(f'Line {i} of a text file.\n' for i in range(200))
+HTML = '<html><body>' + ''.join(
+    f'<p>Paragraph {i} with <b>bold</b> text.</p>' for i in range(50)
+) + '</body></html>'
+
+
+@pytest.mark.parametrize(
+    'name, content, file_type',
+    [('doc.txt', TXT, 'txt'), ('page.html', HTML, 'html')],
+    ids=['txt', 'html'],
+)
+def test_cached_parse_matches_uncached(
+    tmp_path, name, content, file_type,
+):
+    path = tmp_path / name
+    path.write_text(content, encoding='utf-8')
+    input = ParseInput(file_path=str(path), file_type=file_type)
+    kwargs = {'txt': {'block_chars': 100}, 'html': {'read_size': 64}}
+    uncached = AutoParse(**kwargs).parse(input).parsed_data
+    cached = CachedParse(
+        AutoParse(**kwargs), ParseCache(str(tmp_path / 'cache')),
+    )
+
+    miss = cached.parse(input).parsed_data
+    hit = cached.parse(input).parsed_data
+
+    assert cached.misses == 1 and cached.hits == 1
+    assert miss.encode('utf-8') == uncached.encode('utf-8')
+    assert hit.encode('utf-8') == uncached.encode('utf-8')
+    if file_type == 'txt':
+        assert uncached == TXT
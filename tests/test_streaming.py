@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import pyarrow as pa
+from src.components.data_pre.streaming import csv_to_arrow
+
+
+def test_csv_to_arrow_keeps_string_schema_for_empty_chunk(tmp_path):
+    csv_path = tmp_path / 'data.csv'
+    rows = ['query,chunk,response']
+    rows += [f'q{i},c{i},r{i}' for i in range(4)]
+    # The second chunk has no value at all in the 'chunk' column.
+    rows += [f'q{i},,r{i}' for i in range(4, 8)]
+    csv_path.write_text('\n'.join(rows) + '\n', encoding='utf-8')
+    arrow_path = tmp_path / 'data.arrow'
+
+    num_rows = csv_to_arrow(
+        str(csv_path),
+        str(arrow_path),
+        columns={'query': 'instruction', 'chunk': 'input'},
+        chunksize=4,
+    )
+
+    with pa.memory_map(str(arrow_path)) as source:
+        table = pa.ipc.open_stream(source).read_all()
+    assert num_rows == 8
+    assert table.schema.field('input').type == pa.string()
+    assert table.column('input').to_pylist() == [
+        'c0', 'c1', 'c2', 'c3', None, None, None, None,
+    ]
@@ -19,6 +19,9 @@ dataset = data_process.process(
     file_path='dataset/sample/train_data.csv',
     mode='with_context',
     tokenizer=tokenizer,
+    cache_dir='dataset/.cache',
+    tokenize=True,
+    max_seq_length=2048,
 )
 
 # Get trainer